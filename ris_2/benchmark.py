@@ -0,0 +1,409 @@
+import argparse
+import json
+import sys
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from random import Random
+from statistics import quantiles
+from time import perf_counter, process_time
+from typing import Callable, Iterator, TextIO, get_args
+
+from sqlalchemy import event, select
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, DatasetGenerator, load_dataset
+from ris_2.repositories.abc import Repository
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.core import Base, engine, session_factory
+from ris_2.repositories.sql.models import Resume
+from ris_2.repositories.sql.repository import Loading
+from ris_2.testing import (
+    sql_repository,
+    mongo_repository,
+    neo4j_repository,
+    memory_repository,
+)
+from ris_2.utils import chunked
+
+BACKENDS: dict[str, Callable[[], AbstractContextManager[Repository]]] = {
+    'postgres': sql_repository,
+    'mongodb': mongo_repository,
+    'neo4j': neo4j_repository,
+    'memory': memory_repository,
+}
+SIZES = (1_000, 100_000, 1_000_000)
+RESUMES_PER_USER = 5
+
+
+@dataclass
+class Measurement:
+    backend: str
+    size: int
+    method: str
+    calls: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput: float
+
+
+@dataclass
+class LoadingMeasurement:
+    loading: str
+    method: str
+    children: int
+    statements: int
+    rows: int
+    p50_ms: float
+    p95_ms: float
+    # client-side CPU per call: driver, ORM and entity mapping
+    cpu_ms: float
+
+
+@dataclass
+class Sample:
+    """
+    Arguments for the read queries, picked while the dataset is loaded.
+    """
+    resume_ids: list[str]
+    author_ids: list[str]
+    cities: list[e.City]
+
+
+def load(
+    repository: Repository,
+    generator: DatasetGenerator,
+    users: int,
+    sample_size: int,
+    seed: int,
+    batch_size: int = 1000,
+) -> Sample:
+    rng = Random(seed)
+    reservoir: list[tuple[str, str, e.City]] = []
+    seen = 0
+
+    for chunk in chunked(map(generator.user_with_resumes, range(users)), batch_size):
+        resumes = [resume for _, resumes in chunk for resume in resumes]
+        repository.save_users([user for user, _ in chunk])
+        repository.save_resumes(resumes)
+
+        # reservoir sampling keeps memory flat for any dataset size
+        for resume in resumes:
+            item = (resume.id, resume.author.id, resume.hiring_cities[0])
+            seen += 1
+            if len(reservoir) < sample_size:
+                reservoir.append(item)
+            elif (index := rng.randrange(seen)) < sample_size:
+                reservoir[index] = item
+
+    resume_ids, author_ids, cities = zip(*reservoir)
+    return Sample(
+        resume_ids=list(resume_ids),
+        author_ids=list(author_ids),
+        cities=list(cities),
+    )
+
+
+def workloads(
+    repository: Repository,
+    generator: DatasetGenerator,
+    sample: Sample,
+    first_new_user: int,
+    calls: int,
+) -> Iterator[tuple[str, Callable[[int], object]]]:
+    """
+    calls: how many times each workload is going to be called, warmup included.
+    """
+    new_users = iter(range(first_new_user, sys.maxsize))
+
+    def save_user(_: int) -> None:
+        user, _ = generator.user_with_resumes(next(new_users))
+        repository.save_user(user)
+
+    def new_resumes() -> Iterator[e.Resume]:
+        # the authors are saved before the workload, so only save_resume is timed
+        chunk = [generator.user_with_resumes(next(new_users)) for _ in range(calls)]
+        repository.save_users([user for user, _ in chunk])
+        return iter([resumes[0] for _, resumes in chunk])
+
+    def pick(items: list):
+        return lambda i: items[i % len(items)]
+
+    resume_id, author_id, city = (
+        pick(sample.resume_ids),
+        pick(sample.author_ids),
+        pick(sample.cities),
+    )
+
+    yield 'fetch_resume', lambda i: repository.fetch_resume(resume_id(i))
+    yield 'fetch_resumes_by_author', lambda i: repository.fetch_resumes_by_author(author_id(i))
+    yield 'fetch_all_hobbies', lambda i: repository.fetch_all_hobbies()
+    yield 'fetch_all_cities', lambda i: repository.fetch_all_cities()
+    yield 'fetch_hobbies_by_city', lambda i: repository.fetch_hobbies_by_city(city(i))
+    yield 'fetch_users_grouped_by_organization', lambda i: repository.fetch_users_grouped_by_organization()
+    yield 'fetch_coworkers', lambda i: repository.fetch_coworkers(author_id(i))
+    yield 'fetch_overlapping_coworkers', lambda i: repository.fetch_coworkers(author_id(i), overlapping=True)
+    yield 'save_user', save_user
+    resumes = new_resumes()
+    yield 'save_resume', lambda i: repository.save_resume(next(resumes))
+
+
+def measure(
+    backend: str,
+    size: int,
+    method: str,
+    call: Callable[[int], object],
+    calls: int,
+    warmup: int,
+) -> Measurement:
+    for i in range(warmup):
+        call(i)
+
+    timings = []
+    started = perf_counter()
+    for i in range(calls):
+        call_started = perf_counter()
+        call(i)
+        timings.append((perf_counter() - call_started) * 1000)
+    elapsed = perf_counter() - started
+
+    percentiles = quantiles(timings, n=100, method='inclusive')
+    return Measurement(
+        backend=backend,
+        size=size,
+        method=method,
+        calls=calls,
+        p50_ms=percentiles[49],
+        p95_ms=percentiles[94],
+        p99_ms=percentiles[98],
+        throughput=calls / elapsed,
+    )
+
+
+def run(
+    backends: list[str],
+    sizes: list[int],
+    calls: int,
+    warmup: int,
+    seed: int,
+) -> list[Measurement]:
+    measurements = []
+    for backend in backends:
+        for size in sizes:
+            users = max(size // RESUMES_PER_USER, 1)
+            generator = DatasetGenerator(DatasetConfig(
+                users=users,
+                resumes_per_user=RESUMES_PER_USER,
+                seed=seed,
+            ))
+            with BACKENDS[backend]() as repository:
+                sample = load(repository, generator, users, calls, seed)
+                for method, call in workloads(
+                    repository, generator, sample, users, warmup + calls,
+                ):
+                    measurement = measure(backend, size, method, call, calls, warmup)
+                    print(
+                        f'{backend:>8} {size:>9} {method:<36} '
+                        f'p50={measurement.p50_ms:.2f}ms p95={measurement.p95_ms:.2f}ms '
+                        f'p99={measurement.p99_ms:.2f}ms {measurement.throughput:.0f}/s',
+                        file=sys.stderr,
+                    )
+                    measurements.append(measurement)
+
+    return measurements
+
+
+def count_statements(call: Callable[[], object]) -> tuple[int, int]:
+    """
+    Runs call once and returns how many statements it executed
+    and how many rows PostgreSQL sent back for them.
+    """
+    statements = rows = 0
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements, rows
+        statements += 1
+        rows += max(cursor.rowcount, 0)
+
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(engine, 'after_cursor_execute', after_cursor_execute)
+    return statements, rows
+
+
+def run_loading(
+    children: int,
+    resumes: int,
+    calls: int,
+    warmup: int,
+    seed: int,
+) -> list[LoadingMeasurement]:
+    """
+    Compares the SqlRepository loading strategies on one author
+    whose resumes have up to `children` positions, cities and hobbies each.
+    """
+    config = DatasetConfig(
+        users=1,
+        resumes_per_user=resumes,
+        max_cities_per_resume=children,
+        max_hobbies_per_resume=children,
+        max_positions_per_resume=children,
+        seed=seed,
+    )
+    Base.metadata.create_all(engine)
+    try:
+        with session_factory(future=True) as session:
+            load_dataset(SqlRepository(session), config)
+            session.commit()
+            author_id, resume_id = session.execute(
+                select(Resume.author_id, Resume.id).limit(1)
+            ).one()
+
+        measurements = []
+        for loading in get_args(Loading):
+            for method, args in (
+                ('fetch_resume', (str(resume_id),)),
+                ('fetch_resumes_by_author', (str(author_id),)),
+            ):
+                def call(_: int = 0) -> None:
+                    # a fresh session, so nothing is served from the identity map
+                    with session_factory(future=True) as session:
+                        repository = SqlRepository(session, {method: loading})
+                        getattr(repository, method)(*args)
+
+                statements, rows = count_statements(call)
+                cpu_started = process_time()
+                measurement = measure('postgres', resumes, method, call, calls, warmup)
+                cpu_ms = (process_time() - cpu_started) * 1000 / (calls + warmup)
+                print(
+                    f'{loading:>8} {method:<24} statements={statements} rows={rows:<7} '
+                    f'p50={measurement.p50_ms:.2f}ms p95={measurement.p95_ms:.2f}ms '
+                    f'cpu={cpu_ms:.2f}ms',
+                    file=sys.stderr,
+                )
+                measurements.append(LoadingMeasurement(
+                    loading=loading,
+                    method=method,
+                    children=children,
+                    statements=statements,
+                    rows=rows,
+                    p50_ms=measurement.p50_ms,
+                    p95_ms=measurement.p95_ms,
+                    cpu_ms=cpu_ms,
+                ))
+    finally:
+        Base.metadata.drop_all(engine)
+
+    return measurements
+
+
+def compare(old: list[dict], new: list[dict], threshold: float) -> list[str]:
+    """
+    Returns a report line for every (backend, size, method) of run results,
+    or (loading, method, children) of loading results, whose p95
+    grew by more than threshold.
+    """
+    def key(row: dict) -> tuple:
+        if 'loading' in row:
+            return row['loading'], row['method'], row['children']
+        return row['backend'], row['size'], row['method']
+
+    if {'loading' in row for row in old} ^ {'loading' in row for row in new}:
+        raise ValueError('run results can not be compared with loading results')
+
+    baseline = {key(row): row for row in old}
+    regressions = []
+    for row in new:
+        before = baseline.get(key(row))
+        if before is None or before['p95_ms'] == 0:
+            continue
+
+        ratio = row['p95_ms'] / before['p95_ms']
+        if ratio > 1 + threshold:
+            regressions.append(
+                '{} {} {}: p95 {:.2f}ms -> {:.2f}ms (x{:.2f})'.format(
+                    *key(row), before['p95_ms'], row['p95_ms'], ratio,
+                )
+            )
+    return regressions
+
+
+def dump_results(measurements: list, seed: int, output: TextIO) -> None:
+    json.dump(
+        {
+            'created_at': datetime.now().isoformat(),
+            'seed': seed,
+            'results': [asdict(measurement) for measurement in measurements],
+        },
+        output,
+        indent=2,
+    )
+    output.flush()
+
+
+def load_results(file: TextIO) -> list[dict]:
+    report = json.load(file)
+    if not isinstance(report, dict) or 'results' not in report:
+        raise ValueError(f'{file.name} is not written by run or loading')
+    return report['results']
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.benchmark')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='benchmark the repositories')
+    run_parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    run_parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    run_parser.add_argument('--calls', type=int, default=200)
+    run_parser.add_argument('--warmup', type=int, default=20)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout)
+
+    loading_parser = commands.add_parser(
+        'loading',
+        help='compare the SQL loading strategies of resume children',
+    )
+    loading_parser.add_argument('--children', type=int, default=20)
+    loading_parser.add_argument('--resumes', type=int, default=50)
+    loading_parser.add_argument('--calls', type=int, default=100)
+    loading_parser.add_argument('--warmup', type=int, default=10)
+    loading_parser.add_argument('--seed', type=int, default=0)
+    loading_parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout)
+
+    compare_parser = commands.add_parser('compare', help='diff two benchmark runs')
+    compare_parser.add_argument('old', type=argparse.FileType())
+    compare_parser.add_argument('new', type=argparse.FileType())
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    match args.command:
+        case 'run':
+            measurements = run(args.backends, args.sizes, args.calls, args.warmup, args.seed)
+            dump_results(measurements, args.seed, args.output)
+            return 0
+        case 'loading':
+            measurements = run_loading(
+                args.children, args.resumes, args.calls, args.warmup, args.seed,
+            )
+            dump_results(measurements, args.seed, args.output)
+            return 0
+        case _:
+            try:
+                regressions = compare(
+                    load_results(args.old),
+                    load_results(args.new),
+                    args.threshold,
+                )
+            except ValueError as error:
+                parser.error(str(error))
+            for regression in regressions:
+                print(regression)
+            return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
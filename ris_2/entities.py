@@ -47,3 +47,16 @@ class Resume:
     date_created: datetime = field(
         default_factory=lambda: datetime.now().replace(microsecond=0)
     )
+
+
+@dataclass(frozen=True)
+class ResumeCursor:
+    """
+    Keyset position in resume listings ordered by (date_created, id) DESC
+    """
+    date_created: datetime
+    id: str
+
+    @classmethod
+    def from_resume(cls, resume: Resume) -> 'ResumeCursor':
+        return cls(date_created=resume.date_created, id=resume.id)
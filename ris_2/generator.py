@@ -0,0 +1,166 @@
+from bisect import bisect
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from hashlib import sha256
+from itertools import accumulate
+from random import Random
+from typing import Generic, Iterator, Sequence, TypeVar
+
+from ris_2 import entities as e
+from ris_2.repositories.abc import Repository
+from ris_2.utils import chunked
+
+T = TypeVar('T')
+
+FIRST_NAMES = (
+    'Oleh', 'Igor', 'Roman', 'Gleb', 'Olena', 'Iryna', 'Andrii', 'Maria',
+    'Taras', 'Sofiia', 'Dmytro', 'Anna', 'Yurii', 'Kateryna', 'Bohdan',
+)
+LAST_NAMES = (
+    'Kyba', 'Kurilko', 'Syabko', 'Shevchenko', 'Bondarenko', 'Kovalenko',
+    'Tkachenko', 'Kravchenko', 'Melnyk', 'Boiko', 'Moroz', 'Lysenko',
+)
+JOB_TITLES = (
+    'Junior Python Developer', 'Middle Python Developer',
+    'Senior Python Developer', 'Team Lead', 'QA Engineer', 'DevOps Engineer',
+    'Data Scientist', 'Project Manager', 'Recruiter', 'Architect',
+)
+COUNTRIES = ('Ukraine', 'Poland', 'Germany', 'Portugal', 'USA')
+
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    users: int
+    resumes_per_user: int
+    cities: int = 500
+    hobbies: int = 200
+    organizations: int = 5_000
+    max_cities_per_resume: int = 3
+    max_hobbies_per_resume: int = 4
+    max_positions_per_resume: int = 5
+    # Zipf exponent of city, hobby and organization popularity
+    skew: float = 1.1
+    seed: int = 0
+    created_until: datetime = datetime(2022, 11, 1)
+
+
+class ZipfSampler(Generic[T]):
+    """
+    Picks population[k] with probability proportional to 1 / (k + 1) ** skew.
+    """
+
+    def __init__(self, population: Sequence[T], skew: float):
+        self._population = population
+        self._cum_weights = list(accumulate(
+            1 / rank ** skew for rank in range(1, len(population) + 1)
+        ))
+
+    def choice(self, rng: Random) -> T:
+        point = rng.random() * self._cum_weights[-1]
+        index = bisect(self._cum_weights, point)
+        return self._population[min(index, len(self._population) - 1)]
+
+    def sample(self, rng: Random, k: int) -> list[T]:
+        k = min(k, len(self._population))
+        picked = {}
+        while len(picked) < k:
+            item = self.choice(rng)
+            picked[id(item)] = item
+        return list(picked.values())
+
+
+class DatasetGenerator:
+    """
+    A user and their resumes depend only on (seed, user index),
+    so the dataset is streamed and any slice of it can be regenerated.
+    """
+
+    def __init__(self, config: DatasetConfig):
+        self._config = config
+        self._cities = ZipfSampler(
+            [
+                e.City(name=f'City {i}', country=COUNTRIES[i % len(COUNTRIES)])
+                for i in range(config.cities)
+            ],
+            config.skew,
+        )
+        self._hobbies = ZipfSampler(
+            [e.Hobby(name=f'hobby {i}') for i in range(config.hobbies)],
+            config.skew,
+        )
+        self._organizations = ZipfSampler(
+            [f'Organization {i}' for i in range(config.organizations)],
+            config.skew,
+        )
+
+    def __iter__(self) -> Iterator[tuple[e.User, list[e.Resume]]]:
+        for index in range(self._config.users):
+            yield self.user_with_resumes(index)
+
+    def user_with_resumes(self, index: int) -> tuple[e.User, list[e.Resume]]:
+        rng = Random(f'{self._config.seed}:{index}')
+        user = e.User(
+            login=f'user{index}@example.com',
+            password=sha256(f'password{index}'.encode()).hexdigest(),
+        )
+        resumes = [
+            self._resume(rng, user)
+            for _ in range(self._config.resumes_per_user)
+        ]
+        return user, resumes
+
+    def _resume(self, rng: Random, author: e.User) -> e.Resume:
+        config = self._config
+        cities = self._cities.sample(rng, rng.randint(1, config.max_cities_per_resume))
+        hobbies = self._hobbies.sample(rng, rng.randint(0, config.max_hobbies_per_resume))
+        return e.Resume(
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            age=rng.randint(18, 65),
+            author=author,
+            hiring_cities=sorted(
+                (e.City(name=city.name, country=city.country) for city in cities),
+                key=lambda city: city.name,
+            ),
+            hobbies=sorted(
+                (e.Hobby(name=hobby.name) for hobby in hobbies),
+                key=lambda hobby: hobby.name,
+            ),
+            positions=self._positions(rng),
+            date_created=(
+                config.created_until
+                - timedelta(seconds=rng.randrange(5 * 365 * 24 * 60 * 60))
+            ),
+        )
+
+    def _positions(self, rng: Random) -> list[e.Position]:
+        positions = []
+        day = date(2000, 1, 1) + timedelta(days=rng.randrange(15 * 365))
+        for _ in range(rng.randint(0, self._config.max_positions_per_resume)):
+            date_end = day + timedelta(days=rng.randint(90, 3 * 365))
+            positions.append(e.Position(
+                job_title=rng.choice(JOB_TITLES),
+                organization=self._organizations.choice(rng),
+                date_start=day,
+                date_end=date_end,
+            ))
+            day = date_end + timedelta(days=rng.randint(1, 90))
+
+        if positions and rng.random() < 0.5:
+            positions[-1].date_end = None
+        return positions
+
+
+def load_dataset(
+    repository: Repository,
+    config: DatasetConfig,
+    batch_size: int = 1000,
+) -> None:
+    """
+    Streams the dataset into the repository, batch_size users at a time.
+    """
+    for chunk in chunked(DatasetGenerator(config), batch_size):
+        repository.save_users([user for user, _ in chunk])
+        repository.save_resumes([
+            resume for _, resumes in chunk for resume in resumes
+        ])
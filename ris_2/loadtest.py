@@ -0,0 +1,361 @@
+import argparse
+import json
+import sys
+from bisect import bisect
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from random import Random
+from statistics import quantiles
+from threading import Lock, local
+from time import perf_counter, time
+from typing import Any, Callable, Iterator
+
+from ris_2.benchmark import Sample, load
+from ris_2.generator import DatasetConfig, DatasetGenerator
+from ris_2.repositories.abc import Repository
+from ris_2.repositories.memory import MemoryRepository
+
+DEFAULT_MIX = 'fetch_resume=90,fetch_hobbies_by_city=5,save_resume=5'
+METHODS = (
+    'fetch_resume',
+    'fetch_resumes_by_author',
+    'fetch_all_hobbies',
+    'fetch_all_cities',
+    'fetch_hobbies_by_city',
+    'fetch_users_grouped_by_organization',
+    'fetch_coworkers',
+    'save_user',
+    'save_resume',
+)
+# upper bounds of the latency histogram buckets, ms
+BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+RESUMES_PER_USER = 5
+
+
+@dataclass
+class Operation:
+    started_at: float
+    method: str
+    latency_ms: float
+    # time spent waiting for the shared repository, a part of latency_ms
+    wait_ms: float
+
+
+class SerializedRepository:
+    """
+    One repository shared by every worker. A Session (and so SqlRepository)
+    is not thread-safe, so calls have to take turns on a lock; the time
+    spent waiting for it is reported separately.
+    """
+
+    def __init__(self, repository: Repository):
+        self._repository = repository
+        self._lock = Lock()
+        self._waits = local()
+
+    @property
+    def last_wait_ms(self) -> float:
+        return getattr(self._waits, 'ms', 0.0)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self._repository, name)
+
+        def call(*args, **kwargs):
+            started = perf_counter()
+            with self._lock:
+                self._waits.ms = (perf_counter() - started) * 1000
+                return method(*args, **kwargs)
+
+        return call
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(','):
+        method, weight = part.split('=')
+        if method not in METHODS:
+            raise ValueError(f'Unknown method in mix: {method}')
+        weights[method] = float(weight)
+    return weights
+
+
+@contextmanager
+def open_repository(backend: str) -> Iterator[tuple[Repository, Callable[[], None]]]:
+    """
+    Connects a worker to an already loaded database.
+    Yields the repository and a callback committing its writes.
+    """
+    match backend:
+        case 'postgres':
+            from ris_2.repositories.sql import SqlRepository
+            from ris_2.repositories.sql.core import session_factory
+
+            with session_factory(future=True) as session:
+                yield SqlRepository(session), session.commit
+                session.commit()
+        case 'mongodb':
+            from pymongo import MongoClient
+            from ris_2.repositories.doc import MongoRepository
+            from ris_2.settings import MONGODB_URI
+
+            with MongoClient(MONGODB_URI) as client:
+                yield MongoRepository(client.db.users, client.db.resumes), lambda: None
+        case 'neo4j':
+            from neomodel import db
+            from ris_2.repositories.graph import Neo4jRepository
+            from ris_2.settings import NEO4J_URI
+
+            # neomodel's db is thread-local, every worker thread connects itself
+            db.set_connection(NEO4J_URI)
+            yield Neo4jRepository(), lambda: None
+        case _:
+            raise ValueError(f'Backend {backend} can only be shared')
+
+
+@contextmanager
+def loaded_database(
+    backend: str,
+    config: DatasetConfig,
+    sample_size: int,
+) -> Iterator[tuple[Repository | None, Sample]]:
+    """
+    Loads the dataset, yields (repository for shared use, sample)
+    and drops everything afterwards.
+    """
+    generator = DatasetGenerator(config)
+    if backend == 'memory':
+        repository = MemoryRepository()
+        yield repository, load(repository, generator, config.users, sample_size, config.seed)
+        return
+
+    from ris_2.benchmark import BACKENDS
+
+    # conftest context managers own schema setup and teardown
+    with BACKENDS[backend]():
+        with open_repository(backend) as (repository, commit):
+            sample = load(repository, generator, config.users, sample_size, config.seed)
+            commit()
+            yield repository, sample
+
+
+def run_worker(
+    backend: str,
+    config: DatasetConfig,
+    sample: Sample,
+    mix: dict[str, float],
+    worker: int,
+    workers: int,
+    started_at: float,
+    duration: float,
+    shared: Repository | None = None,
+) -> list[Operation]:
+    with (
+        _shared(shared) if shared is not None else open_repository(backend)
+    ) as (repository, commit):
+        rng = Random(f'{config.seed}:worker:{worker}')
+        generator = DatasetGenerator(config)
+        new_users = iter(range(config.users + worker, sys.maxsize, workers))
+        methods, weights = list(mix), list(mix.values())
+
+        operations = []
+        deadline = started_at + duration
+        while (now := time()) < deadline:
+            method = rng.choices(methods, weights)[0]
+            index = rng.randrange(len(sample.resume_ids))
+            if method in ('save_user', 'save_resume'):
+                user, resumes = generator.user_with_resumes(next(new_users))
+            if method == 'save_resume':
+                # the author is not part of the measured call
+                repository.save_user(user)
+                commit()
+
+            call_started = perf_counter()
+            match method:
+                case 'fetch_resume':
+                    repository.fetch_resume(sample.resume_ids[index])
+                case 'fetch_resumes_by_author':
+                    repository.fetch_resumes_by_author(sample.author_ids[index])
+                case 'fetch_hobbies_by_city':
+                    repository.fetch_hobbies_by_city(sample.cities[index])
+                case 'fetch_coworkers':
+                    repository.fetch_coworkers(sample.author_ids[index])
+                case 'save_user':
+                    repository.save_user(user)
+                    commit()
+                case 'save_resume':
+                    repository.save_resume(resumes[0])
+                    commit()
+                case _:
+                    getattr(repository, method)()
+
+            operations.append(Operation(
+                started_at=now - started_at,
+                method=method,
+                latency_ms=(perf_counter() - call_started) * 1000,
+                wait_ms=getattr(shared, 'last_wait_ms', 0.0),
+            ))
+
+    return operations
+
+
+@contextmanager
+def _shared(shared: Repository) -> Iterator[tuple[Repository, Callable[[], None]]]:
+    yield shared, lambda: None
+
+
+def check_pool(backend: str, pool: str, sharing: str) -> None:
+    if sharing == 'shared' and pool == 'process':
+        raise ValueError('Processes can not share a repository')
+    if backend == 'memory' and pool == 'process':
+        # the data lives in this process, workers would have to share it
+        raise ValueError('The memory backend can not be used with processes')
+
+
+def run(
+    backend: str,
+    workers: int,
+    pool: str,
+    sharing: str,
+    mix: dict[str, float],
+    duration: float,
+    users: int,
+    seed: int,
+) -> list[Operation]:
+    config = DatasetConfig(users=users, resumes_per_user=RESUMES_PER_USER, seed=seed)
+    executor_class: type[Executor] = (
+        ProcessPoolExecutor if pool == 'process' else ThreadPoolExecutor
+    )
+    check_pool(backend, pool, sharing)
+
+    with loaded_database(backend, config, sample_size=1000) as (repository, sample):
+        shared = None
+        if sharing == 'shared':
+            shared = SerializedRepository(repository)
+        elif backend == 'memory':
+            # thread-safe on its own
+            shared = repository
+        started_at = time() + 1
+        with executor_class(workers) as executor:
+            futures = [
+                executor.submit(
+                    run_worker,
+                    backend, config, sample, mix,
+                    worker, workers, started_at, duration, shared,
+                )
+                for worker in range(workers)
+            ]
+            return [
+                operation
+                for future in futures
+                for operation in future.result()
+            ]
+
+
+def report(operations: list[Operation], duration: float) -> dict:
+    by_method: dict[str, list[Operation]] = {}
+    for operation in operations:
+        by_method.setdefault(operation.method, []).append(operation)
+
+    methods = {}
+    for method, method_operations in sorted(by_method.items()):
+        latencies = [operation.latency_ms for operation in method_operations]
+        methods[method] = {
+            'calls': len(latencies),
+            'throughput': len(latencies) / duration,
+            **_percentiles(latencies),
+            'mean_wait_ms': sum(op.wait_ms for op in method_operations) / len(latencies),
+            'histogram': _histogram(latencies),
+        }
+
+    timeline = []
+    for second in range(int(duration)):
+        window = [
+            operation.latency_ms
+            for operation in operations
+            if second <= operation.started_at < second + 1
+        ]
+        timeline.append({
+            'second': second,
+            'throughput': len(window),
+            **_percentiles(window),
+            'histogram': _histogram(window),
+        })
+
+    return {
+        'buckets_ms': list(BUCKETS_MS),
+        'throughput': len(operations) / duration,
+        'methods': methods,
+        'timeline': timeline,
+    }
+
+
+def _histogram(latencies: list[float]) -> list[int]:
+    """
+    Counts per BUCKETS_MS bucket, the last one is above every bound.
+    """
+    histogram = [0] * (len(BUCKETS_MS) + 1)
+    for latency in latencies:
+        histogram[bisect(BUCKETS_MS, latency)] += 1
+    return histogram
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float | None]:
+    if len(latencies) < 2:
+        latency = latencies[0] if latencies else None
+        return {'p50_ms': latency, 'p95_ms': latency, 'p99_ms': latency}
+
+    percentiles = quantiles(latencies, n=100, method='inclusive')
+    return {
+        'p50_ms': percentiles[49],
+        'p95_ms': percentiles[94],
+        'p99_ms': percentiles[98],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.loadtest')
+    parser.add_argument('--backend', choices=('postgres', 'mongodb', 'neo4j', 'memory'), required=True)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+    parser.add_argument(
+        '--sharing',
+        choices=('per-worker', 'shared'),
+        default='per-worker',
+        help='own repository per worker, or one repository behind a lock',
+    )
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout)
+    args = parser.parse_args(argv)
+
+    try:
+        check_pool(args.backend, args.pool, args.sharing)
+    except ValueError as error:
+        parser.error(str(error))
+
+    operations = run(
+        args.backend, args.workers, args.pool, args.sharing,
+        args.mix, args.duration, args.users, args.seed,
+    )
+    result = report(operations, args.duration)
+    json.dump(
+        {
+            'backend': args.backend,
+            'workers': args.workers,
+            'pool': args.pool,
+            'sharing': args.sharing,
+            'mix': args.mix,
+            **result,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
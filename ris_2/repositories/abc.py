@@ -1,6 +1,6 @@
-from typing import Protocol
+from typing import Iterator, Protocol
 
-from ris_2.entities import Resume, Hobby, City, User
+from ris_2.entities import Resume, ResumeCursor, Hobby, City, User
 
 
 class Repository(Protocol):
@@ -8,7 +8,29 @@ class Repository(Protocol):
     def fetch_resume(self, id_: str) -> Resume:
         ...
 
-    def fetch_resumes_by_author(self, author_id: str) -> list[Resume]:
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: ResumeCursor | None = None,
+    ) -> list[Resume]:
+        ...
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: ResumeCursor | None = None,
+    ) -> list[Resume]:
+        ...
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[Resume]:
+        ...
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[Resume]:
         ...
 
     def fetch_all_hobbies(self) -> list[Hobby]:
@@ -20,7 +42,19 @@ class Repository(Protocol):
     def fetch_hobbies_by_city(self, city: City) -> list[Hobby]:
         ...
 
-    def fetch_users_grouped_by_organization(self) -> dict[str, list[User]]:
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[User]]:
+        ...
+
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[User]:
+        """
+        Other users who worked at any organization the user worked at,
+        ordered by login. overlapping: only those whose position there
+        overlapped in time with one of the user's, an active position
+        (date_end is None) lasting indefinitely.
+        """
         ...
 
     def save_user(self, user: User):
@@ -28,3 +62,60 @@ class Repository(Protocol):
 
     def save_resume(self, resume: Resume) -> None:
         ...
+
+    def save_users(self, users: list[User]) -> None:
+        ...
+
+    def save_resumes(self, resumes: list[Resume]) -> None:
+        ...
+
+
+class AsyncRepository(Protocol):
+
+    async def fetch_resume(self, id_: str) -> Resume:
+        ...
+
+    async def fetch_resumes(
+        self,
+        limit: int,
+        after: ResumeCursor | None = None,
+    ) -> list[Resume]:
+        ...
+
+    async def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: ResumeCursor | None = None,
+    ) -> list[Resume]:
+        ...
+
+    async def fetch_all_hobbies(self) -> list[Hobby]:
+        ...
+
+    async def fetch_all_cities(self) -> list[City]:
+        ...
+
+    async def fetch_hobbies_by_city(self, city: City) -> list[Hobby]:
+        ...
+
+    async def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[User]]:
+        ...
+
+    async def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[User]:
+        ...
+
+    async def save_user(self, user: User):
+        ...
+
+    async def save_resume(self, resume: Resume) -> None:
+        ...
+
+    async def save_users(self, users: list[User]) -> None:
+        ...
+
+    async def save_resumes(self, resumes: list[Resume]) -> None:
+        ...
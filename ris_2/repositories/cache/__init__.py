@@ -0,0 +1 @@
+from ris_2.repositories.cache.repository import CachingRepository, CacheStats
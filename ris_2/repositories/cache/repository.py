@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from ris_2 import entities as e
+from ris_2.repositories.abc import Repository
+
+_ALL_HOBBIES = ('all_hobbies',)
+_ALL_CITIES = ('all_cities',)
+_USERS_BY_ORGANIZATION = ('users_by_organization', None)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class CachingRepository:
+    """
+    Read-through cache in front of any repository.
+    Cached entities are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self._repository = repository
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._stats = CacheStats()
+        # bumped by every write, so loads racing a write are not stored
+        self._generation = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def fetch_resume(self, id_: str) -> e.Resume:
+        return self._get_or_load(
+            ('resume', id_),
+            lambda: self._repository.fetch_resume(id_),
+        )
+
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return self._repository.fetch_resumes(limit, after)
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        # only full listings are cached, pages are passed through
+        if limit is not None or after is not None:
+            return self._repository.fetch_resumes_by_author(author_id, limit, after)
+
+        return self._get_or_load(
+            ('resumes_by_author', author_id),
+            lambda: self._repository.fetch_resumes_by_author(author_id),
+        )
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[e.Resume]:
+        return self._repository.iter_resumes(batch_size)
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[e.Resume]:
+        return self._repository.iter_resumes_by_author(author_id, batch_size)
+
+    def fetch_all_hobbies(self) -> list[e.Hobby]:
+        return self._get_or_load(_ALL_HOBBIES, self._repository.fetch_all_hobbies)
+
+    def fetch_all_cities(self) -> list[e.City]:
+        return self._get_or_load(_ALL_CITIES, self._repository.fetch_all_cities)
+
+    def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        return self._get_or_load(
+            ('hobbies_by_city', city.country, city.name),
+            lambda: self._repository.fetch_hobbies_by_city(city),
+        )
+
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        return self._get_or_load(
+            ('users_by_organization', organization),
+            lambda: self._repository.fetch_users_grouped_by_organization(organization),
+        )
+
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        # changes with any resume at any of the user's organizations,
+        # which can't be told apart on write, so it is not cached
+        return self._repository.fetch_coworkers(user_id, overlapping)
+
+    def save_user(self, user: e.User) -> None:
+        self._repository.save_user(user)
+        self._invalidate_user(user)
+
+    def save_resume(self, resume: e.Resume) -> None:
+        self._repository.save_resume(resume)
+        self._invalidate_resume(resume)
+
+    def save_users(self, users: list[e.User]) -> None:
+        self._repository.save_users(users)
+        for user in users:
+            self._invalidate_user(user)
+
+    def save_resumes(self, resumes: list[e.Resume]) -> None:
+        self._repository.save_resumes(resumes)
+        for resume in resumes:
+            self._invalidate_resume(resume)
+
+    def _invalidate_user(self, user: e.User) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidate(('resumes_by_author', user.id))
+
+    def _invalidate_resume(self, resume: e.Resume) -> None:
+        """
+        The distinct city and hobby listings stay valid and are kept when
+        they already contain everything the resume brings. Hobbies by city
+        are not distinct on every backend, so they are always dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            self._invalidate(('resumes_by_author', resume.author.id))
+            self._invalidate_unless_contains(_ALL_CITIES, resume.hiring_cities)
+            self._invalidate_unless_contains(_ALL_HOBBIES, resume.hobbies)
+            for city in resume.hiring_cities:
+                self._invalidate(('hobbies_by_city', city.country, city.name))
+            if resume.positions:
+                self._invalidate(_USERS_BY_ORGANIZATION)
+            for position in resume.positions:
+                self._invalidate(('users_by_organization', position.organization))
+
+    def _get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return value
+
+                del self._entries[key]
+                self._stats.expirations += 1
+
+            self._stats.misses += 1
+            generation = self._generation
+
+        value = load()
+
+        with self._lock:
+            if generation != self._generation:
+                return value
+
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+        return value
+
+    def _invalidate(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._stats.invalidations += 1
+
+    def _invalidate_unless_contains(self, key: Hashable, items: Iterable) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+
+        _, cached = entry
+        if any(item not in cached for item in items):
+            self._invalidate(key)
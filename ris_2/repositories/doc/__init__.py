@@ -1 +1,2 @@
 from ris_2.repositories.doc.repository import MongoRepository
+from ris_2.repositories.doc.async_repository import AsyncMongoRepository
@@ -0,0 +1,239 @@
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING
+
+from ris_2 import entities as e
+from ris_2.repositories.doc.repository import MongoRepository
+from ris_2.repositories.doc.indexes import (
+    USER_INDEXES,
+    RESUME_INDEXES,
+    CITY_HOBBY_INDEXES,
+    ORGANIZATION_INDEXES,
+)
+from ris_2.repositories.doc.pipelines import (
+    resumes_with_author_pipeline,
+    users_grouped_by_organization_pipeline,
+    coworkers_pipeline,
+    overlapping_coworkers_pipeline,
+)
+
+
+class AsyncMongoRepository:
+    def __init__(
+        self,
+        users_collection: AsyncIOMotorCollection,
+        resumes_collection: AsyncIOMotorCollection,
+        hobbies_collection: AsyncIOMotorCollection | None = None,
+        cities_collection: AsyncIOMotorCollection | None = None,
+        city_hobbies_collection: AsyncIOMotorCollection | None = None,
+        organizations_collection: AsyncIOMotorCollection | None = None,
+        embed_author: bool = False,
+    ):
+        database = resumes_collection.database
+        self._embed_author = embed_author
+        self._user_collection = users_collection
+        self._resumes_collection = resumes_collection
+        self._hobbies_collection = hobbies_collection or database.hobbies
+        self._cities_collection = cities_collection or database.cities
+        self._city_hobbies_collection = city_hobbies_collection or database.city_hobbies
+        self._organizations_collection = organizations_collection or database.organizations
+
+    async def ensure_indexes(self) -> list[str]:
+        return [
+            *await self._user_collection.create_indexes(USER_INDEXES),
+            *await self._resumes_collection.create_indexes(RESUME_INDEXES),
+            *await self._city_hobbies_collection.create_indexes(CITY_HOBBY_INDEXES),
+            *await self._organizations_collection.create_indexes(ORGANIZATION_INDEXES),
+        ]
+
+    async def fetch_resume(self, id_: str) -> e.Resume:
+        if self._embed_author:
+            resume_doc, = await self._resumes_collection.find(
+                {'_id': ObjectId(id_)},
+            ).to_list(None)
+            return MongoRepository._resume_doc_to_entity(
+                resume_doc,
+                MongoRepository._embedded_author_doc(resume_doc),
+            )
+
+        resume_doc, = await self._resumes_collection.aggregate(
+            resumes_with_author_pipeline(
+                {'_id': ObjectId(id_)},
+                users_collection=self._user_collection.name,
+            )
+        ).to_list(None)
+        return MongoRepository._resume_doc_to_entity(resume_doc, resume_doc['author'])
+
+    async def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._fetch_resumes(MongoRepository._after_filter(after), limit)
+
+    async def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._fetch_resumes(
+            {'author_id': ObjectId(author_id), **MongoRepository._after_filter(after)},
+            limit,
+        )
+
+    async def fetch_all_hobbies(self) -> list[e.Hobby]:
+        cursor = self._hobbies_collection.find(
+            {'count': {'$gt': 0}},
+            sort=[('_id', ASCENDING)],
+        )
+        return [e.Hobby(doc['_id']) async for doc in cursor]
+
+    async def fetch_all_cities(self) -> list[e.City]:
+        cursor = self._cities_collection.find(
+            {'count': {'$gt': 0}},
+            sort=[('_id', ASCENDING)],
+        )
+        return [e.City(**doc['_id']) async for doc in cursor]
+
+    async def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        cursor = self._city_hobbies_collection.find(
+            MongoRepository._city_hobbies_filter(city),
+            sort=[('hobby', ASCENDING)],
+        )
+        return [e.Hobby(doc['hobby']) async for doc in cursor]
+
+    async def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        cursor = self._organizations_collection.aggregate(
+            users_grouped_by_organization_pipeline(
+                self._user_collection.name,
+                organization,
+            )
+        )
+        return MongoRepository._group_users_by_organization(
+            await cursor.to_list(None)
+        )
+
+    async def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        if not overlapping:
+            cursor = self._organizations_collection.aggregate(
+                coworkers_pipeline(ObjectId(user_id), self._user_collection.name)
+            )
+            return [
+                MongoRepository._user_doc_to_entity(user_doc)
+                async for user_doc in cursor
+            ]
+
+        positions = [
+            position
+            async for resume_doc in self._resumes_collection.find(
+                {'author_id': ObjectId(user_id)},
+                {'positions': 1},
+            )
+            for position in resume_doc['positions']
+        ]
+        if not positions:
+            return []
+
+        cursor = self._resumes_collection.aggregate(
+            overlapping_coworkers_pipeline(
+                ObjectId(user_id),
+                positions,
+                self._user_collection.name,
+            )
+        )
+        return [
+            MongoRepository._user_doc_to_entity(user_doc)
+            async for user_doc in cursor
+        ]
+
+    async def save_user(self, user: e.User) -> None:
+        user_doc = MongoRepository._user_entity_to_doc(user)
+        result = await self._user_collection.insert_one(user_doc)
+        user.id = str(result.inserted_id)
+
+    async def update_user(self, user: e.User) -> None:
+        user_doc = MongoRepository._user_entity_to_doc(user)
+        await self._user_collection.replace_one({'_id': ObjectId(user.id)}, user_doc)
+        if self._embed_author:
+            await self._resumes_collection.update_many(
+                {'author_id': ObjectId(user.id)},
+                {'$set': {'author': MongoRepository._author_snapshot(user_doc)}},
+            )
+
+    async def save_resume(self, resume: e.Resume) -> None:
+        resume_doc = MongoRepository._resume_entity_to_doc(resume, self._embed_author)
+        result = await self._resumes_collection.insert_one(resume_doc)
+        resume.id = str(result.inserted_id)
+        await self._update_aggregates([resume])
+
+    async def save_users(self, users: list[e.User]) -> None:
+        if not users:
+            return
+
+        result = await self._user_collection.insert_many([
+            MongoRepository._user_entity_to_doc(user)
+            for user in users
+        ])
+        for user, inserted_id in zip(users, result.inserted_ids):
+            user.id = str(inserted_id)
+
+    async def save_resumes(self, resumes: list[e.Resume]) -> None:
+        if not resumes:
+            return
+
+        result = await self._resumes_collection.insert_many([
+            MongoRepository._resume_entity_to_doc(resume, self._embed_author)
+            for resume in resumes
+        ])
+        for resume, inserted_id in zip(resumes, result.inserted_ids):
+            resume.id = str(inserted_id)
+        await self._update_aggregates(resumes)
+
+    async def _update_aggregates(self, resumes: list[e.Resume]) -> None:
+        for collection, updates in zip(
+            (
+                self._hobbies_collection,
+                self._cities_collection,
+                self._city_hobbies_collection,
+                self._organizations_collection,
+            ),
+            (
+                *MongoRepository._counter_updates(resumes),
+                MongoRepository._organization_updates(resumes),
+            ),
+        ):
+            if updates:
+                await collection.bulk_write(updates, ordered=False)
+
+    async def _fetch_resumes(self, match: dict, limit: int | None) -> list[e.Resume]:
+        if self._embed_author:
+            cursor = (
+                self._resumes_collection
+                .find(match)
+                .sort(MongoRepository.RESUMES_ORDER)
+                .limit(limit or 0)
+            )
+            return [
+                MongoRepository._resume_doc_to_entity(
+                    resume_doc,
+                    MongoRepository._embedded_author_doc(resume_doc),
+                )
+                async for resume_doc in cursor
+            ]
+
+        cursor = self._resumes_collection.aggregate(
+            resumes_with_author_pipeline(
+                match,
+                MongoRepository.RESUMES_ORDER,
+                limit,
+                self._user_collection.name,
+            )
+        )
+        return [
+            MongoRepository._resume_doc_to_entity(resume_doc, resume_doc['author'])
+            async for resume_doc in cursor
+        ]
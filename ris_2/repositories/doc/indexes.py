@@ -0,0 +1,73 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collection import Collection
+
+USER_INDEXES = [
+    IndexModel([('login', ASCENDING)], name='login', unique=True),
+]
+RESUME_INDEXES = [
+    IndexModel(
+        [('author_id', ASCENDING), ('date_created', DESCENDING), ('_id', DESCENDING)],
+        name='author_id_date_created_id',
+    ),
+    IndexModel(
+        [('date_created', DESCENDING), ('_id', DESCENDING)],
+        name='date_created_id',
+    ),
+    # multikey, bounds on both fields only combine within $elemMatch
+    IndexModel(
+        [('positions.organization', ASCENDING), ('positions.date_start', ASCENDING)],
+        name='positions_organization_date_start',
+    ),
+]
+
+# hobbies and cities are keyed and sorted by their _id
+CITY_HOBBY_INDEXES = [
+    IndexModel(
+        [('city_name', ASCENDING), ('city_country', ASCENDING), ('hobby', ASCENDING)],
+        name='city_hobby',
+        unique=True,
+    ),
+]
+
+
+# organizations are keyed by name, members holds the ids of their users
+ORGANIZATION_INDEXES = [
+    IndexModel([('members', ASCENDING)], name='members'),
+]
+
+
+def ensure_indexes(
+    users_collection: Collection,
+    resumes_collection: Collection,
+    city_hobbies_collection: Collection,
+    organizations_collection: Collection,
+) -> list[str]:
+    """
+    Idempotent: existing indexes with the same definition are kept.
+    """
+    return [
+        *users_collection.create_indexes(USER_INDEXES),
+        *resumes_collection.create_indexes(RESUME_INDEXES),
+        *city_hobbies_collection.create_indexes(CITY_HOBBY_INDEXES),
+        *organizations_collection.create_indexes(ORGANIZATION_INDEXES),
+    ]
+
+
+def used_indexes(explain: dict | list) -> set[str]:
+    """
+    Names of the indexes scanned anywhere in an explain() output,
+    for find() and aggregate() plans alike.
+    """
+    match explain:
+        case dict():
+            found = {explain['indexName']} if 'indexName' in explain else set()
+            for value in explain.values():
+                found |= used_indexes(value)
+            return found
+        case list():
+            found = set()
+            for value in explain:
+                found |= used_indexes(value)
+            return found
+        case _:
+            return set()
@@ -0,0 +1,202 @@
+from bson import ObjectId
+from pymongo import ASCENDING
+
+
+def resumes_with_author_pipeline(
+    match: dict,
+    sort: list[tuple[str, int]] | None = None,
+    limit: int | None = None,
+    users_collection: str = 'users',
+) -> list[dict]:
+    """
+    Resumes together with their author document, in one round trip.
+    """
+    return [
+        {'$match': match},
+        *([{'$sort': dict(sort)}] if sort else []),
+        *([{'$limit': limit}] if limit else []),
+        {
+            '$lookup': {
+                'from': users_collection,
+                'localField': 'author_id',
+                'foreignField': '_id',
+                'as': 'author',
+            },
+        },
+        {'$unwind': '$author'},
+    ]
+
+
+def hobby_counts_pipeline() -> list[dict]:
+    """
+    Documents of the hobbies collection, recounted from the resumes.
+    """
+    return [
+        {'$project': {'hobbies': 1}},
+        {'$unwind': '$hobbies'},
+        {'$group': {'_id': '$hobbies', 'count': {'$sum': 1}}},
+    ]
+
+
+def city_counts_pipeline() -> list[dict]:
+    """
+    Documents of the cities collection, recounted from the resumes.
+    """
+    return [
+        {'$project': {'hiring_cities': 1}},
+        {'$unwind': '$hiring_cities'},
+        {
+            '$group': {
+                '_id': {
+                    'name': '$hiring_cities.name',
+                    'country': '$hiring_cities.country',
+                },
+                'count': {'$sum': 1},
+            },
+        },
+    ]
+
+
+def city_hobby_counts_pipeline() -> list[dict]:
+    """
+    Documents of the city_hobbies collection, recounted from the resumes.
+    """
+    return [
+        {'$project': {'hiring_cities': 1, 'hobbies': 1}},
+        {'$unwind': '$hiring_cities'},
+        {'$unwind': '$hobbies'},
+        {
+            '$group': {
+                '_id': {
+                    'city_name': '$hiring_cities.name',
+                    'city_country': '$hiring_cities.country',
+                    'hobby': '$hobbies',
+                },
+                'count': {'$sum': 1},
+            },
+        },
+        {
+            '$project': {
+                '_id': 0,
+                'city_name': '$_id.city_name',
+                'city_country': '$_id.city_country',
+                'hobby': '$_id.hobby',
+                'count': 1,
+            },
+        },
+    ]
+
+
+def organizations_pipeline() -> list[dict]:
+    """
+    Documents of the organizations collection, regrouped from the resumes.
+    """
+    return [
+        {'$project': {'positions': 1, 'author_id': 1}},
+        {'$unwind': '$positions'},
+        {
+            '$group': {
+                '_id': '$positions.organization',
+                'members': {'$addToSet': '$author_id'},
+            },
+        },
+    ]
+
+
+def users_grouped_by_organization_pipeline(
+    users_collection: str = 'users',
+    organization: str | None = None,
+) -> list[dict]:
+    """
+    Runs on the organizations collection.
+    """
+    return [
+        *([{'$match': {'_id': organization}}] if organization is not None else []),
+        {
+           '$lookup': {
+               'from': users_collection,
+               'localField': 'members',
+               'foreignField': '_id',
+               'as': 'users',
+           },
+        },
+        {'$unwind': '$users'},
+        {'$sort': {'_id': ASCENDING, 'users.login': ASCENDING}},
+        {'$group': {'_id': '$_id', 'users': {'$push': '$users'}}},
+    ]
+
+
+def coworkers_pipeline(user_id: ObjectId, users_collection: str = 'users') -> list[dict]:
+    """
+    Runs on the organizations collection, the first stage is served by the members index.
+    """
+    return [
+        {'$match': {'members': user_id}},
+        {'$unwind': '$members'},
+        {'$match': {'members': {'$ne': user_id}}},
+        {'$group': {'_id': '$members'}},
+        *_users_by_id(users_collection),
+    ]
+
+
+def overlapping_coworkers_pipeline(
+    user_id: ObjectId,
+    positions: list[dict],
+    users_collection: str = 'users',
+) -> list[dict]:
+    """
+    Runs on the resumes collection, positions are the user's own.
+    Each $elemMatch is bounded by organization and date_start
+    on the positions_organization_date_start index.
+    """
+    return [
+        {
+            '$match': {
+                '$or': [
+                    {'positions': {'$elemMatch': _overlapping_position(position)}}
+                    for position in positions
+                ],
+                'author_id': {'$ne': user_id},
+            },
+        },
+        {'$group': {'_id': '$author_id'}},
+        *_users_by_id(users_collection),
+    ]
+
+
+def _overlapping_position(position: dict) -> dict:
+    """
+    A position at the same organization, overlapping the given one in time.
+    A missing date_end stands for an active position.
+    """
+    return {
+        'organization': position['organization'],
+        **(
+            {'date_start': {'$lte': position['date_end']}}
+            if position['date_end'] is not None
+            else {}
+        ),
+        '$or': [
+            {'date_end': None},
+            {'date_end': {'$gte': position['date_start']}},
+        ],
+    }
+
+
+def _users_by_id(users_collection: str) -> list[dict]:
+    """
+    Replaces documents keyed by a user id with the users, ordered by login.
+    """
+    return [
+        {
+           '$lookup': {
+               'from': users_collection,
+               'localField': '_id',
+               'foreignField': '_id',
+               'as': 'user',
+           },
+        },
+        {'$unwind': '$user'},
+        {'$replaceRoot': {'newRoot': '$user'}},
+        {'$sort': {'login': ASCENDING}},
+    ]
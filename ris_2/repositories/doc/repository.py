@@ -1,127 +1,476 @@
+from collections import Counter
 from datetime import datetime
+from typing import Iterable, Iterator
 
 from bson import ObjectId
-from pymongo import DESCENDING, ASCENDING
+from pymongo import DESCENDING, ASCENDING, UpdateMany, UpdateOne
 from pymongo.collection import Collection
+from pymongo.cursor import Cursor
 
 from ris_2 import entities as e
+from ris_2.utils import chunked
+from ris_2.repositories.doc.indexes import ensure_indexes
+from ris_2.repositories.doc.pipelines import (
+    resumes_with_author_pipeline,
+    hobby_counts_pipeline,
+    city_counts_pipeline,
+    city_hobby_counts_pipeline,
+    organizations_pipeline,
+    users_grouped_by_organization_pipeline,
+    coworkers_pipeline,
+    overlapping_coworkers_pipeline,
+)
 
 
 class MongoRepository:
+    RESUMES_ORDER = [('date_created', DESCENDING), ('_id', DESCENDING)]
+
     def __init__(
         self,
         users_collection: Collection,
         resumes_collection: Collection,
+        hobbies_collection: Collection | None = None,
+        cities_collection: Collection | None = None,
+        city_hobbies_collection: Collection | None = None,
+        organizations_collection: Collection | None = None,
+        embed_author: bool = False,
     ):
+        """
+        hobbies, cities and city_hobbies hold reference counts of the values
+        used by resumes, organizations the ids of the users who worked there.
+        They default to siblings of the resumes collection.
+        embed_author: store a snapshot of the author in every resume document,
+        so resumes are read without a users lookup.
+        """
+        database = resumes_collection.database
+        self._embed_author = embed_author
         self._user_collection = users_collection
         self._resumes_collection = resumes_collection
+        self._hobbies_collection = hobbies_collection or database.hobbies
+        self._cities_collection = cities_collection or database.cities
+        self._city_hobbies_collection = city_hobbies_collection or database.city_hobbies
+        self._organizations_collection = organizations_collection or database.organizations
+
+    def ensure_indexes(self) -> list[str]:
+        return ensure_indexes(
+            self._user_collection,
+            self._resumes_collection,
+            self._city_hobbies_collection,
+            self._organizations_collection,
+        )
+
+    def rebuild_counters(self) -> None:
+        """
+        Recounts hobbies, cities and city_hobbies from the resumes,
+        e.g. for data written before the counters existed.
+        """
+        for pipeline, collection in (
+            (hobby_counts_pipeline(), self._hobbies_collection),
+            (city_counts_pipeline(), self._cities_collection),
+            (city_hobby_counts_pipeline(), self._city_hobbies_collection),
+        ):
+            self._resumes_collection.aggregate([*pipeline, {'$out': collection.name}])
+
+    def rebuild_organizations(self) -> None:
+        """
+        Regroups organizations from the resumes,
+        e.g. for data written before the collection existed.
+        """
+        self._resumes_collection.aggregate([
+            *organizations_pipeline(),
+            {'$out': self._organizations_collection.name},
+        ])
+
+    def check_author_snapshots(self, repair: bool = False, batch_size: int = 1000) -> int:
+        """
+        Counts resumes whose embedded author is missing or differs from
+        the users collection, rewriting them when repair is set.
+        Users are processed batch_size at a time.
+        """
+        stale = 0
+        users = self._user_collection.find({}, sort=[('_id', ASCENDING)])
+        for user_docs in chunked(users, batch_size):
+            filters = [
+                MongoRepository._stale_author_filter(user_doc)
+                for user_doc in user_docs
+            ]
+            if not repair:
+                stale += self._resumes_collection.count_documents({'$or': filters})
+                continue
+
+            result = self._resumes_collection.bulk_write(
+                [
+                    UpdateMany(
+                        stale_filter,
+                        {'$set': {'author': MongoRepository._author_snapshot(user_doc)}},
+                    )
+                    for stale_filter, user_doc in zip(filters, user_docs)
+                ],
+                ordered=False,
+            )
+            stale += result.modified_count
+
+        return stale
 
     def fetch_resume(self, id_: str) -> e.Resume:
-        resume_doc = self._resumes_collection.find_one(ObjectId(id_))
-        author_doc = self._user_collection.find_one(resume_doc['author_id'])
-        return self._resume_doc_to_entity(resume_doc, author_doc)
+        if self._embed_author:
+            resume_doc, = self._resumes_collection.find({'_id': ObjectId(id_)})
+            return MongoRepository._resume_doc_to_entity(
+                resume_doc,
+                MongoRepository._embedded_author_doc(resume_doc),
+            )
+
+        resume_doc, = self._resumes_collection.aggregate(
+            resumes_with_author_pipeline(
+                {'_id': ObjectId(id_)},
+                users_collection=self._user_collection.name,
+            )
+        )
+        return self._resume_doc_to_entity(resume_doc, resume_doc['author'])
 
-    def fetch_resumes_by_author(self, author_id: str) -> list[e.Resume]:
-        author_id = ObjectId(author_id)
-        author_doc = self._user_collection.find_one(author_id)
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return self._fetch_resumes(MongoRepository._after_filter(after), limit)
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return self._fetch_resumes(
+            {'author_id': ObjectId(author_id), **MongoRepository._after_filter(after)},
+            limit,
+        )
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[e.Resume]:
         cursor = (
             self._resumes_collection
-            .find({'author_id': author_id})
-            .sort('date_created', DESCENDING)
+            .find()
+            .sort('_id', ASCENDING)
+            .batch_size(batch_size)
         )
-        return [
-            MongoRepository._resume_doc_to_entity(resume_doc, author_doc)
-            for resume_doc in cursor
-        ]
+        return self._stream_resumes(cursor, batch_size)
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[e.Resume]:
+        cursor = (
+            self._resumes_collection
+            .find({'author_id': ObjectId(author_id)})
+            .sort(MongoRepository.RESUMES_ORDER)
+            .batch_size(batch_size)
+        )
+        return self._stream_resumes(cursor, batch_size)
 
     def fetch_all_hobbies(self) -> list[e.Hobby]:
-        cursor = self._resumes_collection.aggregate(
-            [
-                {'$project': {'hobbies': 1}},
-                {'$unwind': '$hobbies'},
-                {'$group': {'_id': '$hobbies'}},
-                {'$sort': {'_id': ASCENDING}},
-            ]
+        cursor = self._hobbies_collection.find(
+            {'count': {'$gt': 0}},
+            sort=[('_id', ASCENDING)],
         )
-        return [e.Hobby(hobby['_id']) for hobby in cursor]
+        return [e.Hobby(doc['_id']) for doc in cursor]
 
     def fetch_all_cities(self) -> list[e.City]:
-        cursor = self._resumes_collection.aggregate(
-            [
-                {'$project': {'hiring_cities': 1}},
-                {'$unwind': '$hiring_cities'},
-                {
-                    '$group': {
-                        '_id': {
-                            'name': '$hiring_cities.name',
-                            'country': '$hiring_cities.country',
-                        },
-                    },
-                },
-                {'$sort': {'_id.name': ASCENDING, '_id.country': ASCENDING}},
-            ]
+        cursor = self._cities_collection.find(
+            {'count': {'$gt': 0}},
+            sort=[('_id', ASCENDING)],
         )
         return [e.City(**doc['_id']) for doc in cursor]
 
     def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        cursor = self._city_hobbies_collection.find(
+            MongoRepository._city_hobbies_filter(city),
+            sort=[('hobby', ASCENDING)],
+        )
+        return [e.Hobby(doc['hobby']) for doc in cursor]
+
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        cursor = self._organizations_collection.aggregate(
+            users_grouped_by_organization_pipeline(
+                self._user_collection.name,
+                organization,
+            )
+        )
+        return MongoRepository._group_users_by_organization(cursor)
+
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        if not overlapping:
+            cursor = self._organizations_collection.aggregate(
+                coworkers_pipeline(ObjectId(user_id), self._user_collection.name)
+            )
+            return [MongoRepository._user_doc_to_entity(user_doc) for user_doc in cursor]
+
+        positions = [
+            position
+            for resume_doc in self._resumes_collection.find(
+                {'author_id': ObjectId(user_id)},
+                {'positions': 1},
+            )
+            for position in resume_doc['positions']
+        ]
+        if not positions:
+            return []
+
         cursor = self._resumes_collection.aggregate(
-            [
-                {'$project': {'hobbies': 1, 'hiring_cities': 1}},
-                {'$unwind': '$hiring_cities'},
-                {
-                    '$match': {
-                        '$and': [
-                            {'hiring_cities.name': city.name},
-                            {'hiring_cities.country': city.country},
-                        ],
-                    },
-                },
-                {'$unwind': '$hobbies'},
-                {'$group': {'_id': '$hobbies'}},
-                {'$sort': {'_id': ASCENDING}},
-            ]
+            overlapping_coworkers_pipeline(
+                ObjectId(user_id),
+                positions,
+                self._user_collection.name,
+            )
         )
-        return [e.Hobby(doc['_id']) for doc in cursor]
+        return [MongoRepository._user_doc_to_entity(user_doc) for user_doc in cursor]
+
+    def save_user(self, user: e.User) -> None:
+        user_doc = MongoRepository._user_entity_to_doc(user)
+        result = self._user_collection.insert_one(user_doc)
+        user.id = str(result.inserted_id)
+
+    def update_user(self, user: e.User) -> None:
+        """
+        Rewrites a saved user together with the author snapshots
+        embedded in its resumes.
+        """
+        user_doc = MongoRepository._user_entity_to_doc(user)
+        self._user_collection.replace_one({'_id': ObjectId(user.id)}, user_doc)
+        if self._embed_author:
+            self._resumes_collection.update_many(
+                {'author_id': ObjectId(user.id)},
+                {'$set': {'author': MongoRepository._author_snapshot(user_doc)}},
+            )
+
+    def save_resume(self, resume: e.Resume) -> None:
+        resume_doc = MongoRepository._resume_entity_to_doc(resume, self._embed_author)
+        result = self._resumes_collection.insert_one(resume_doc)
+        resume.id = str(result.inserted_id)
+        self._update_aggregates([resume])
+
+    def save_users(self, users: list[e.User]) -> None:
+        if not users:
+            return
+
+        result = self._user_collection.insert_many([
+            MongoRepository._user_entity_to_doc(user)
+            for user in users
+        ])
+        for user, inserted_id in zip(users, result.inserted_ids):
+            user.id = str(inserted_id)
+
+    def save_resumes(self, resumes: list[e.Resume]) -> None:
+        if not resumes:
+            return
+
+        result = self._resumes_collection.insert_many([
+            MongoRepository._resume_entity_to_doc(resume, self._embed_author)
+            for resume in resumes
+        ])
+        for resume, inserted_id in zip(resumes, result.inserted_ids):
+            resume.id = str(inserted_id)
+        self._update_aggregates(resumes)
+
+    def _update_aggregates(self, resumes: list[e.Resume]) -> None:
+        for collection, updates in zip(
+            (
+                self._hobbies_collection,
+                self._cities_collection,
+                self._city_hobbies_collection,
+                self._organizations_collection,
+            ),
+            (
+                *MongoRepository._counter_updates(resumes),
+                MongoRepository._organization_updates(resumes),
+            ),
+        ):
+            if updates:
+                collection.bulk_write(updates, ordered=False)
+
+    def _fetch_resumes(self, match: dict, limit: int | None) -> list[e.Resume]:
+        if self._embed_author:
+            cursor = (
+                self._resumes_collection
+                .find(match)
+                .sort(MongoRepository.RESUMES_ORDER)
+                .limit(limit or 0)
+            )
+            return [
+                MongoRepository._resume_doc_to_entity(
+                    resume_doc,
+                    MongoRepository._embedded_author_doc(resume_doc),
+                )
+                for resume_doc in cursor
+            ]
 
-    def fetch_users_grouped_by_organization(self) -> dict[str, list[e.User]]:
         cursor = self._resumes_collection.aggregate(
-            [
-                {'$project': {'positions': 1, 'author_id': 1}},
-                {'$unwind': '$positions'},
-                {
-                    '$group': {
-                        '_id': '$positions.organization',
-                        'author_ids': {'$addToSet': '$author_id'},
-                    },
-                },
+            resumes_with_author_pipeline(
+                match,
+                MongoRepository.RESUMES_ORDER,
+                limit,
+                self._user_collection.name,
+            )
+        )
+        return [
+            MongoRepository._resume_doc_to_entity(resume_doc, resume_doc['author'])
+            for resume_doc in cursor
+        ]
+
+    def _stream_resumes(self, cursor: Cursor, batch_size: int) -> Iterator[e.Resume]:
+        """
+        Authors are looked up once per batch of resumes, unless embedded.
+        """
+        if self._embed_author:
+            for resume_doc in cursor:
+                yield MongoRepository._resume_doc_to_entity(
+                    resume_doc,
+                    MongoRepository._embedded_author_doc(resume_doc),
+                )
+            return
+
+        for resume_docs in chunked(cursor, batch_size):
+            author_ids = list({doc['author_id'] for doc in resume_docs})
+            author_docs = {
+                author_doc['_id']: author_doc
+                for author_doc in self._user_collection.find({'_id': {'$in': author_ids}})
+            }
+            for resume_doc in resume_docs:
+                yield MongoRepository._resume_doc_to_entity(
+                    resume_doc,
+                    author_docs[resume_doc['author_id']],
+                )
+
+    @staticmethod
+    def _after_filter(after: e.ResumeCursor | None) -> dict:
+        if after is None:
+            return {}
+
+        return {
+            '$or': [
+                {'date_created': {'$lt': after.date_created}},
                 {
-                   '$lookup': {
-                       'from': 'users',
-                       'localField': 'author_ids',
-                       'foreignField': '_id',
-                       'as': 'users',
-                   },
+                    'date_created': after.date_created,
+                    '_id': {'$lt': ObjectId(after.id)},
                 },
-                {'$unwind': '$users'},
-                {'$sort': {'_id': ASCENDING, 'users.login': ASCENDING}},
-                {'$group': {'_id': '$_id', 'users': {'$push': '$users'}}},
-            ]
+            ],
+        }
+
+    @staticmethod
+    def _city_hobbies_filter(city: e.City) -> dict:
+        return {
+            'city_name': city.name,
+            'city_country': city.country,
+            'count': {'$gt': 0},
+        }
+
+    @staticmethod
+    def _counter_updates(
+        resumes: list[e.Resume],
+    ) -> tuple[list[UpdateOne], list[UpdateOne], list[UpdateOne]]:
+        """
+        One upsert per distinct hobby, city and (city, hobby) of the resumes,
+        incrementing its reference count.
+        """
+        hobbies = Counter(hobby.name for resume in resumes for hobby in resume.hobbies)
+        cities = Counter(
+            (city.name, city.country)
+            for resume in resumes
+            for city in resume.hiring_cities
+        )
+        city_hobbies = Counter(
+            (city.name, city.country, hobby.name)
+            for resume in resumes
+            for city in resume.hiring_cities
+            for hobby in resume.hobbies
+        )
+        return (
+            [
+                UpdateOne({'_id': name}, {'$inc': {'count': count}}, upsert=True)
+                for name, count in hobbies.items()
+            ],
+            [
+                UpdateOne(
+                    {'_id': {'name': name, 'country': country}},
+                    {'$inc': {'count': count}},
+                    upsert=True,
+                )
+                for (name, country), count in cities.items()
+            ],
+            [
+                UpdateOne(
+                    {'city_name': name, 'city_country': country, 'hobby': hobby},
+                    {'$inc': {'count': count}},
+                    upsert=True,
+                )
+                for (name, country, hobby), count in city_hobbies.items()
+            ],
         )
+
+    @staticmethod
+    def _organization_updates(resumes: list[e.Resume]) -> list[UpdateOne]:
+        """
+        One upsert per distinct organization of the resumes, adding their authors.
+        """
+        members: dict[str, set[ObjectId]] = {}
+        for resume in resumes:
+            for position in resume.positions:
+                members.setdefault(position.organization, set()).add(
+                    ObjectId(resume.author.id)
+                )
+        return [
+            UpdateOne(
+                {'_id': organization},
+                {'$addToSet': {'members': {'$each': sorted(user_ids)}}},
+                upsert=True,
+            )
+            for organization, user_ids in members.items()
+        ]
+
+    @staticmethod
+    def _group_users_by_organization(docs: Iterable[dict]) -> dict[str, list[e.User]]:
         return {
             doc['_id']: [
                 MongoRepository._user_doc_to_entity(user)
                 for user in doc['users']
             ]
-            for doc in cursor
+            for doc in docs
         }
 
-    def save_user(self, user: e.User) -> None:
-        user_doc = {'login': user.login, 'password': user.password}
-        result = self._user_collection.insert_one(user_doc)
-        user.id = str(result.inserted_id)
+    @staticmethod
+    def _user_entity_to_doc(user: e.User) -> dict:
+        return {'login': user.login, 'password': user.password}
 
-    def save_resume(self, resume: e.Resume) -> None:
-        resume_doc = {
+    @staticmethod
+    def _author_snapshot(user_doc: dict) -> dict:
+        return {'login': user_doc['login'], 'password': user_doc['password']}
+
+    @staticmethod
+    def _embedded_author_doc(resume_doc: dict) -> dict:
+        return {'_id': resume_doc['author_id'], **resume_doc['author']}
+
+    @staticmethod
+    def _stale_author_filter(user_doc: dict) -> dict:
+        return {
+            'author_id': user_doc['_id'],
+            '$or': [
+                {'author.login': {'$ne': user_doc['login']}},
+                {'author.password': {'$ne': user_doc['password']}},
+            ],
+        }
+
+    @staticmethod
+    def _resume_entity_to_doc(resume: e.Resume, embed_author: bool = False) -> dict:
+        author = (
+            {'author': MongoRepository._user_entity_to_doc(resume.author)}
+            if embed_author
+            else {}
+        )
+        return {
+            **author,
             'first_name': resume.first_name,
             'last_name': resume.last_name,
             'age': resume.age,
@@ -141,9 +490,6 @@ class MongoRepository:
             'hobbies': [hobby.name for hobby in resume.hobbies]
         }
 
-        result = self._resumes_collection.insert_one(resume_doc)
-        resume.id = str(result.inserted_id)
-
     @staticmethod
     def _user_doc_to_entity(user_doc: dict) -> e.User:
         return e.User(
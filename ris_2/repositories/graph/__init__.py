@@ -1 +1,2 @@
 from ris_2.repositories.graph.repository import Neo4jRepository
+from ris_2.repositories.graph.async_repository import AsyncNeo4jRepository
@@ -0,0 +1,88 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from neomodel import db
+
+from ris_2 import entities as e
+from ris_2.repositories.graph.repository import Neo4jRepository
+
+
+class AsyncNeo4jRepository:
+    """
+    neomodel and the neo4j driver it pins are synchronous, so queries
+    run on a thread pool. neomodel's db is thread-local: every worker
+    opens its own connection and the workers query concurrently.
+    """
+
+    def __init__(self, url: str, max_workers: int = 8):
+        self._repository = Neo4jRepository()
+        self._executor = ThreadPoolExecutor(
+            max_workers,
+            thread_name_prefix='neo4j',
+            initializer=db.set_connection,
+            initargs=(url,),
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    async def fetch_resume(self, id_: str) -> e.Resume:
+        return await self._run(self._repository.fetch_resume, id_)
+
+    async def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._run(self._repository.fetch_resumes, limit, after)
+
+    async def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._run(
+            self._repository.fetch_resumes_by_author,
+            author_id,
+            limit,
+            after,
+        )
+
+    async def fetch_all_hobbies(self) -> list[e.Hobby]:
+        return await self._run(self._repository.fetch_all_hobbies)
+
+    async def fetch_all_cities(self) -> list[e.City]:
+        return await self._run(self._repository.fetch_all_cities)
+
+    async def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        return await self._run(self._repository.fetch_hobbies_by_city, city)
+
+    async def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        return await self._run(
+            self._repository.fetch_users_grouped_by_organization,
+            organization,
+        )
+
+    async def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        return await self._run(self._repository.fetch_coworkers, user_id, overlapping)
+
+    async def save_user(self, user: e.User) -> None:
+        await self._run(self._repository.save_user, user)
+
+    async def save_resume(self, resume: e.Resume) -> None:
+        await self._run(self._repository.save_resume, resume)
+
+    async def save_users(self, users: list[e.User]) -> None:
+        await self._run(self._repository.save_users, users)
+
+    async def save_resumes(self, resumes: list[e.Resume]) -> None:
+        await self._run(self._repository.save_resumes, resumes)
+
+    async def _run(self, method: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, method, *args)
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from neomodel import db
+
+from ris_2.repositories.graph import queries
+from ris_2.repositories.graph.schema import install_indexes
+from ris_2.settings import NEO4J_URI
+
+
+def migrate_organizations(batch_size: int = 10_000) -> int:
+    """
+    Links positions created before Organization nodes existed to their
+    organization, one transaction per batch_size positions.
+    Safe to run again. Returns the number of linked positions.
+    """
+    linked = 0
+    while True:
+        with db.write_transaction:
+            results, _ = db.cypher_query(
+                queries.LINK_POSITIONS_TO_ORGANIZATIONS,
+                {'batch_size': batch_size},
+            )
+        (count,), = results
+        if not count:
+            return linked
+
+        linked += count
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.repositories.graph.migrations')
+    parser.add_argument('migration', choices=['organizations'])
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    db.set_connection(NEO4J_URI)
+    # the unique constraint on Organization.name keeps MERGE from duplicating nodes
+    install_indexes()
+    linked = migrate_organizations(args.batch_size)
+    print(f'linked {linked} positions', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,12 +22,19 @@ class City(StructuredNode):
     resumes = RelationshipFrom('Resume', 'HIRING_IN')
 
 
+class Organization(StructuredNode):
+    name = StringProperty(max_length=120, unique_index=True, required=True)
+
+
 class Position(StructuredNode):
     job_title = StringProperty(max_length=120, required=True)
+    # copy of the organization's name, so resumes are read without the traversal
     organization = StringProperty(max_length=120, required=True)
     date_start = DateProperty(required=True)
     date_end = DateProperty()
 
+    employer = RelationshipTo(Organization, 'AT', cardinality=One)
+
 
 class User(StructuredNode):
     uid = UniqueIdProperty()
@@ -42,7 +49,7 @@ class Resume(StructuredNode):
     first_name = StringProperty(max_length=120, required=True)
     last_name = StringProperty(max_length=120, required=True)
     age = IntegerProperty(required=True)
-    date_created = DateTimeProperty(default_now=True)
+    date_created = DateTimeProperty(default_now=True, index=True)
 
     author = RelationshipTo(User, 'IS_AUTHOR', cardinality=One)
     hiring_cities = RelationshipTo(City, 'HIRING_IN')
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from statistics import median
+
+from neo4j import ResultSummary
+from neomodel import db
+
+
+@dataclass
+class ServerTimings:
+    # time until the first record was available, includes planning
+    available_after_ms: int
+    # time spent streaming the records after that
+    consumed_after_ms: int
+
+    @property
+    def total_ms(self) -> int:
+        return self.available_after_ms + self.consumed_after_ms
+
+
+@dataclass
+class PlanningCost:
+    replanned: ServerTimings
+    cached: ServerTimings
+
+    @property
+    def planning_ms(self) -> int:
+        """
+        Estimated planning time: how much longer the first record
+        takes when the plan cache is bypassed.
+        """
+        return max(self.replanned.available_after_ms - self.cached.available_after_ms, 0)
+
+
+def server_timings(query: str, params: dict | None = None) -> ServerTimings:
+    summary = _consume(query, params)
+    return ServerTimings(summary.result_available_after, summary.result_consumed_after)
+
+
+def profiled_operators(query: str, params: dict | None = None) -> dict[str, list[str]]:
+    """
+    Operators of the executed plan, e.g. NodeIndexSeek or NodeByLabelScan,
+    mapped to the details of every occurrence. The query is run through
+    PROFILE, so the changes of a write query are applied.
+    """
+    operators = {}
+    plans = [_consume(f'PROFILE {query}', params).profile]
+    while plans:
+        plan = plans.pop()
+        operator, _, _ = plan['operatorType'].partition('@')
+        operators.setdefault(operator, []).append(plan.get('args', {}).get('Details', ''))
+        plans.extend(plan.get('children', []))
+    return operators
+
+
+def planning_cost(query: str, params: dict | None = None, repeat: int = 5) -> PlanningCost:
+    """
+    Compares runs forced to replan with runs hitting the plan cache.
+    Read-only queries only: the query is executed 2 * repeat + 1 times.
+    """
+    # warms the plan cache
+    server_timings(query, params)
+    replanned = [server_timings(f'CYPHER replan=force {query}', params) for _ in range(repeat)]
+    cached = [server_timings(query, params) for _ in range(repeat)]
+    return PlanningCost(_median_timings(replanned), _median_timings(cached))
+
+
+def _consume(query: str, params: dict | None) -> ResultSummary:
+    if db.driver is None:
+        db.set_connection(db.url)
+
+    with db.driver.session(database=db._database_name) as session:
+        return session.run(query, params or {}).consume()
+
+
+def _median_timings(timings: list[ServerTimings]) -> ServerTimings:
+    return ServerTimings(
+        int(median(timing.available_after_ms for timing in timings)),
+        int(median(timing.consumed_after_ms for timing in timings)),
+    )
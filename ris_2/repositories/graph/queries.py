@@ -0,0 +1,193 @@
+# Every Cypher statement of Neo4jRepository. Values are always passed as
+# parameters, so the text of a statement never changes and Neo4j plans it
+# once and then reuses the cached plan.
+from itertools import product
+
+# one row per resume: its properties, author and pre-ordered children as maps
+RESUME_PROJECTION = '''
+MATCH (resume) -[:IS_AUTHOR]-> (author: User)
+CALL {
+    WITH resume
+    OPTIONAL MATCH (resume) -[:LIKE]-> (hobby: Hobby)
+    WITH hobby
+    ORDER BY hobby.name
+    RETURN collect(hobby.name) AS hobbies
+}
+CALL {
+    WITH resume
+    OPTIONAL MATCH (resume) -[:HIRING_IN]-> (city: City)
+    WITH city
+    ORDER BY city.name, city.country
+    RETURN collect(city {.name, .country}) AS hiring_cities
+}
+CALL {
+    WITH resume
+    OPTIONAL MATCH (resume) -[:WORK_AS]-> (position: Position)
+    WITH position
+    ORDER BY position.date_start
+    RETURN collect(
+        position {.job_title, .organization, .date_start, .date_end}
+    ) AS positions
+}
+WITH
+    resume {.uid, .first_name, .last_name, .age, .date_created} AS resume,
+    author {.uid, .login, .password} AS author,
+    hobbies,
+    hiring_cities,
+    positions
+'''
+RESUME_COLUMNS = 'RETURN resume, author, hobbies, hiring_cities, positions'
+
+FETCH_RESUME = f'''
+MATCH (resume: Resume)
+WHERE resume.uid = $uid
+{RESUME_PROJECTION}
+{RESUME_COLUMNS}
+'''
+
+ITER_RESUMES = f'''
+MATCH (resume: Resume)
+WHERE resume.uid > $last_uid
+WITH resume
+ORDER BY resume.uid
+LIMIT $batch_size
+{RESUME_PROJECTION}
+{RESUME_COLUMNS}
+ORDER BY resume.uid
+'''
+
+ALL_RESUMES_MATCH = 'MATCH (resume: Resume)'
+AUTHOR_RESUMES_MATCH = 'MATCH (resume: Resume) -[:IS_AUTHOR]-> (: User {uid: $author_id})'
+# the first conjunct alone is a range seek on the Resume.date_created index
+RESUMES_AFTER_PREDICATE = '''
+WHERE resume.date_created <= $after.date_created
+    AND (resume.date_created < $after.date_created OR resume.uid < $after.uid)
+'''
+
+
+def _resumes_page(match: str, with_after: bool, with_limit: bool) -> str:
+    return f'''
+{match}
+{RESUMES_AFTER_PREDICATE if with_after else ''}
+WITH resume
+ORDER BY resume.date_created DESC, resume.uid DESC
+{'LIMIT $limit' if with_limit else ''}
+{RESUME_PROJECTION}
+{RESUME_COLUMNS}
+ORDER BY resume.date_created DESC, resume.uid DESC
+'''
+
+
+# keyset pages over the (date_created, uid) DESC order,
+# keyed by (match, with_after, with_limit)
+RESUMES_PAGE: dict[tuple[str, bool, bool], str] = {
+    (match, with_after, with_limit): _resumes_page(match, with_after, with_limit)
+    for match, with_after, with_limit in product(
+        (ALL_RESUMES_MATCH, AUTHOR_RESUMES_MATCH),
+        (False, True),
+        (False, True),
+    )
+}
+
+ALL_HOBBIES = '''
+MATCH (hobby: Hobby)
+RETURN hobby.name
+ORDER BY hobby.name
+'''
+
+ALL_CITIES = '''
+MATCH (city: City)
+RETURN city.name, city.country
+ORDER BY city.name, city.country
+'''
+
+HOBBIES_BY_CITY = '''
+MATCH
+    (city: City {name: $name, country: $country})
+    <-[:HIRING_IN]- (resume: Resume) -[:LIKE]-> (hobby: Hobby)
+RETURN hobby.name
+ORDER BY hobby.name
+'''
+
+USERS_GROUPED_BY_ORGANIZATION = '''
+MATCH
+    (organization: Organization) <-[:AT]- (: Position)
+    <-[:WORK_AS]- (: Resume) -[:IS_AUTHOR]-> (user: User)
+RETURN DISTINCT organization.name, user
+ORDER BY organization.name, user.login
+'''
+
+USERS_OF_ORGANIZATION = '''
+MATCH
+    (organization: Organization {name: $organization}) <-[:AT]- (: Position)
+    <-[:WORK_AS]- (: Resume) -[:IS_AUTHOR]-> (user: User)
+RETURN DISTINCT organization.name, user
+ORDER BY user.login
+'''
+
+# seeks the user by uid, the rest are traversals
+COWORKERS = '''
+MATCH
+    (: User {uid: $user_id}) <-[:IS_AUTHOR]- (: Resume)
+    -[:WORK_AS]-> (: Position) -[:AT]-> (organization: Organization)
+WITH DISTINCT organization
+MATCH
+    (organization) <-[:AT]- (: Position)
+    <-[:WORK_AS]- (: Resume) -[:IS_AUTHOR]-> (coworker: User)
+WHERE coworker.uid <> $user_id
+RETURN DISTINCT coworker
+ORDER BY coworker.login
+'''
+
+# dates are stored as ISO strings, so they compare chronologically; the
+# positions are reached from the user's organizations, not through an index
+OVERLAPPING_COWORKERS = '''
+MATCH
+    (: User {uid: $user_id}) <-[:IS_AUTHOR]- (: Resume)
+    -[:WORK_AS]-> (own: Position) -[:AT]-> (organization: Organization)
+MATCH (organization) <-[:AT]- (other: Position)
+WHERE (own.date_end IS NULL OR other.date_start <= own.date_end)
+    AND (other.date_end IS NULL OR other.date_end >= own.date_start)
+MATCH (other) <-[:WORK_AS]- (: Resume) -[:IS_AUTHOR]-> (coworker: User)
+WHERE coworker.uid <> $user_id
+RETURN DISTINCT coworker
+ORDER BY coworker.login
+'''
+
+# one batch of positions created before Organization nodes existed
+LINK_POSITIONS_TO_ORGANIZATIONS = '''
+MATCH (position: Position)
+WHERE NOT (position) -[:AT]-> (: Organization)
+WITH position
+LIMIT $batch_size
+MERGE (organization: Organization {name: position.organization})
+CREATE (position) -[:AT]-> (organization)
+RETURN count(position)
+'''
+
+CREATE_USERS = '''
+UNWIND $users AS props
+CREATE (user: User)
+SET user = props
+'''
+
+CREATE_RESUMES = '''
+UNWIND $resumes AS data
+MATCH (author: User {uid: data.author_id})
+CREATE (resume: Resume) -[:IS_AUTHOR]-> (author)
+SET resume = data.props
+FOREACH (city_props IN data.hiring_cities |
+    MERGE (city: City {name: city_props.name, country: city_props.country})
+    CREATE (resume) -[:HIRING_IN]-> (city)
+)
+FOREACH (position_props IN data.positions |
+    MERGE (organization: Organization {name: position_props.organization})
+    CREATE (resume) -[:WORK_AS]-> (position: Position) -[:AT]-> (organization)
+    SET position = position_props
+)
+FOREACH (hobby_props IN data.hobbies |
+    MERGE (hobby: Hobby {name: hobby_props.name})
+    CREATE (resume) -[:LIKE]-> (hobby)
+)
+RETURN resume.uid
+'''
@@ -1,79 +1,119 @@
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import asdict
+from typing import Iterator
 
 from neomodel import db
 
 from ris_2 import entities as e
+from ris_2.utils import chunked
+from ris_2.repositories.graph import queries
 from ris_2.repositories.graph.models import User, Resume, City, Position, Hobby
 
 
+def _write_transaction() -> AbstractContextManager:
+    """
+    A write transaction, unless the caller has already begun one:
+    neomodel can not nest them, the writes then join the caller's.
+    """
+    if db._active_transaction is not None:
+        return nullcontext()
+    return db.write_transaction
+
+
 class Neo4jRepository:
+    BULK_CHUNK_SIZE = 1000
+
     def fetch_resume(self, id_: str) -> e.Resume:
-        results, _ = db.cypher_query(
-            f'''
-            MATCH 
-                (resume: Resume) -[rel]-> (neighbor)
-            WHERE resume.uid = '{id_}'
-            RETURN resume, neighbor
-            ORDER BY neighbor.name, neighbor.country, neighbor.date_start
-            ''',
-            resolve_objects=True,
+        results, _ = db.cypher_query(queries.FETCH_RESUME, {'uid': id_})
+        row, = results
+        return self._resume_row_to_entity(*row)
+
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        resumes, _ = self._fetch_resumes_page(
+            queries.ALL_RESUMES_MATCH,
+            {},
+            limit,
+            Neo4jRepository._cursor_to_params(after),
         )
-        row, *_ = self._map_resumes_result(results)
-        return self._resume_model_to_entity(*row)
-
-    def fetch_resumes_by_author(self, author_id: str) -> list[e.Resume]:
-        results, cols = db.cypher_query(
-            f'''
-            MATCH 
-                (resume: Resume) -[IS_AUTHOR]-> (author: User {{uid: '{author_id}'}}),
-                (resume: Resume) -[rel]-> (neighbor)
-            RETURN author, resume, neighbor
-            ORDER BY resume.date_created DESC, neighbor.name, neighbor.country, neighbor.date_start
-            ''',
-            resolve_objects=True,
+        return resumes
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        resumes, _ = self._fetch_resumes_page(
+            queries.AUTHOR_RESUMES_MATCH,
+            {'author_id': author_id},
+            limit,
+            Neo4jRepository._cursor_to_params(after),
         )
-        author = results[0][0]
-        results = [row[1:] for row in results]
-        return [
-            self._resume_model_to_entity(row[0], author, row[2], row[3], row[4])
-            for row in self._map_resumes_result(results)
-        ]
+        return resumes
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[e.Resume]:
+        last_uid = ''
+        while True:
+            results, _ = db.cypher_query(
+                queries.ITER_RESUMES,
+                {'last_uid': last_uid, 'batch_size': batch_size},
+            )
+            if not results:
+                return
+
+            for row in results:
+                yield self._resume_row_to_entity(*row)
+
+            last_resume, *_ = results[-1]
+            last_uid = last_resume['uid']
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[e.Resume]:
+        last = None
+        while True:
+            resumes, last = self._fetch_resumes_page(
+                queries.AUTHOR_RESUMES_MATCH,
+                {'author_id': author_id},
+                batch_size,
+                last,
+            )
+            if not resumes:
+                return
+
+            yield from resumes
 
     def fetch_all_hobbies(self) -> list[e.Hobby]:
-        return [
-            e.Hobby(hobby.name)
-            for hobby in Hobby.nodes.order_by('name').all()
-        ]
+        results, _ = db.cypher_query(queries.ALL_HOBBIES)
+        return [e.Hobby(name) for name, in results]
 
     def fetch_all_cities(self) -> list[e.City]:
-        return [
-            e.City(city.name, city.country)
-            for city in City.nodes.order_by('name', 'country').all()
-        ]
+        results, _ = db.cypher_query(queries.ALL_CITIES)
+        return [e.City(name, country) for name, country in results]
 
     def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
         results, _ = db.cypher_query(
-            f'''
-            MATCH 
-                (city: City {{name: '{city.name}', country: '{city.country}'}}) 
-                <-[HIRING_IN]- (resume: Resume) -[LIKE]-> (hobby: Hobby)
-            RETURN hobby
-            ORDER BY hobby.name
-            ''',
-            resolve_objects=True,
+            queries.HOBBIES_BY_CITY,
+            {'name': city.name, 'country': city.country},
         )
-        return [e.Hobby(hobby.name) for hobby, in results]
+        return [e.Hobby(name) for name, in results]
 
-    def fetch_users_grouped_by_organization(self) -> dict[str, list[e.User]]:
-        results, _ = db.cypher_query(
-            '''
-            MATCH 
-                (user: User) <-[IS_AUTHOR]- (resume: Resume) -[WORK_AS]-> (position: Position)
-            RETURN position.organization, user
-            ORDER BY position.organization, user.login
-            ''',
-            resolve_objects=True,
-        )
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        if organization is None:
+            query, params = queries.USERS_GROUPED_BY_ORGANIZATION, {}
+        else:
+            query, params = queries.USERS_OF_ORGANIZATION, {'organization': organization}
+
+        results, _ = db.cypher_query(query, params, resolve_objects=True)
         organization_to_users = {}
         for organization, user in results:
             users = organization_to_users.setdefault(organization, [])
@@ -81,85 +121,113 @@ class Neo4jRepository:
 
         return organization_to_users
 
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        results, _ = db.cypher_query(
+            queries.OVERLAPPING_COWORKERS if overlapping else queries.COWORKERS,
+            {'user_id': user_id},
+            resolve_objects=True,
+        )
+        return [self._user_model_to_entity(user) for user, in results]
+
     def save_user(self, user: e.User) -> None:
-        db_user = User(login=user.login, password=user.password)
-        db_user.save()
-        user.id = db_user.uid
+        self.save_users([user])
 
     def save_resume(self, resume: e.Resume) -> None:
-        author = User.nodes.get(uid=resume.author.id)
-        hiring_cities = City.get_or_create(
-            *(asdict(city) for city in resume.hiring_cities)
-        )
-        positions = Position.get_or_create(
-            *(asdict(position) for position in resume.positions)
-        )
-        hobbies = Hobby.get_or_create(
-            *(asdict(hobby) for hobby in resume.hobbies)
-        )
+        params = self._resume_entity_to_params(resume)
+        results, _ = db.cypher_query(queries.CREATE_RESUMES, {'resumes': [params]})
+        if not results:
+            raise User.DoesNotExist(f'User {resume.author.id} does not exist')
 
-        db_resume = Resume(
-            first_name=resume.first_name,
-            last_name=resume.last_name,
-            age=resume.age,
-            date_created=resume.date_created,
-        )
-        db_resume.save()
+        (resume.id,), = results
 
-        db_resume.author.connect(author)
+    def save_users(self, users: list[e.User]) -> None:
+        with _write_transaction():
+            for chunk in chunked(users, self.BULK_CHUNK_SIZE):
+                users_props = [
+                    User.deflate({'login': user.login, 'password': user.password})
+                    for user in chunk
+                ]
+                db.cypher_query(
+                    queries.CREATE_USERS,
+                    {'users': users_props},
+                )
+                for user, props in zip(chunk, users_props):
+                    user.id = props['uid']
 
-        for city in hiring_cities:
-            db_resume.hiring_cities.connect(city)
+    def save_resumes(self, resumes: list[e.Resume]) -> None:
+        ids = []
+        with _write_transaction():
+            for chunk in chunked(resumes, self.BULK_CHUNK_SIZE):
+                resumes_data = [
+                    self._resume_entity_to_params(resume) for resume in chunk
+                ]
+                results, _ = db.cypher_query(
+                    queries.CREATE_RESUMES,
+                    {'resumes': resumes_data},
+                )
+                created = {uid for uid, in results}
+                for resume, data in zip(chunk, resumes_data):
+                    # the MATCH on the author drops a resume without failing
+                    if data['props']['uid'] not in created:
+                        raise User.DoesNotExist(f'User {resume.author.id} does not exist')
+                    ids.append(data['props']['uid'])
 
-        for position in positions:
-            db_resume.positions.connect(position)
+        for resume, id_ in zip(resumes, ids):
+            resume.id = id_
 
-        for hobby in hobbies:
-            db_resume.hobbies.connect(hobby)
+    def _fetch_resumes_page(
+        self,
+        match: str,
+        params: dict,
+        limit: int | None,
+        after: dict | None,
+    ) -> tuple[list[e.Resume], dict | None]:
+        """
+        Keyset pagination over the (date_created, uid) DESC order.
+        Returns the page and the raw cursor of its last resume.
+        """
+        results, _ = db.cypher_query(
+            queries.RESUMES_PAGE[(match, after is not None, limit is not None)],
+            {**params, 'after': after, 'limit': limit},
+        )
+        if not results:
+            return [], None
 
-        db_resume.save()
-        resume.id = db_resume.uid
+        resumes = [self._resume_row_to_entity(*row) for row in results]
+        last_resume, *_ = results[-1]
+        return resumes, {
+            'date_created': last_resume['date_created'],
+            'uid': last_resume['uid'],
+        }
 
     @staticmethod
-    def _map_resumes_result(
-        results: list[tuple[Resume, User | City | Position | Hobby]]
-    ) -> list[tuple[Resume, User, list[Hobby], list[City], list[Position]]]:
-        resumes = []
-        resumes_relations = {}
-
-        for resume, neighbor in results:
-            if resume not in resumes:
-                resumes.append(resume)
-
-            relations = resumes_relations.setdefault(
-                resume.uid,
-                {
-                    'author': None,
-                    'hobbies': [],
-                    'positions': [],
-                    'cities': [],
-                }
-            )
+    def _resume_entity_to_params(resume: e.Resume) -> dict:
+        return {
+            'author_id': resume.author.id,
+            'props': Resume.deflate({
+                'first_name': resume.first_name,
+                'last_name': resume.last_name,
+                'age': resume.age,
+                'date_created': resume.date_created,
+            }),
+            'hiring_cities': [
+                City.deflate(asdict(city)) for city in resume.hiring_cities
+            ],
+            'positions': [
+                Position.deflate(asdict(position)) for position in resume.positions
+            ],
+            'hobbies': [Hobby.deflate(asdict(hobby)) for hobby in resume.hobbies],
+        }
 
-            if isinstance(neighbor, Hobby):
-                relations['hobbies'].append(neighbor)
-            elif isinstance(neighbor, Position):
-                relations['positions'].append(neighbor)
-            elif isinstance(neighbor, City):
-                relations['cities'].append(neighbor)
-            elif isinstance(neighbor, User):
-                relations['author'] = neighbor
-
-        return [
-            (
-                resume,
-                resumes_relations[resume.uid]['author'],
-                resumes_relations[resume.uid]['hobbies'],
-                resumes_relations[resume.uid]['cities'],
-                resumes_relations[resume.uid]['positions'],
-            )
-            for resume in resumes
-        ]
+    @staticmethod
+    def _cursor_to_params(cursor: e.ResumeCursor | None) -> dict | None:
+        if cursor is None:
+            return None
+
+        return {
+            'date_created': Resume.date_created.deflate(cursor.date_created),
+            'uid': cursor.id,
+        }
 
     @staticmethod
     def _user_model_to_entity(user: User) -> e.User:
@@ -170,52 +238,41 @@ class Neo4jRepository:
         )
 
     @staticmethod
-    def _hobby_model_to_entity(hobby: Hobby) -> e.Hobby:
-        return e.Hobby(
-            name=hobby.name,
-        )
-
-    @staticmethod
-    def _city_model_to_entity(city: City) -> e.City:
-        return e.City(
-            name=city.name,
-            country=city.country,
-        )
-
-    @staticmethod
-    def _position_model_to_entity(position: Position) -> e.Position:
-        return e.Position(
-            job_title=position.job_title,
-            organization=position.organization,
-            date_start=position.date_start,
-            date_end=position.date_end,
-        )
-
-    @staticmethod
-    def _resume_model_to_entity(
-        resume: Resume,
-        author: User,
-        hobbies: list[Hobby],
-        hiring_cities: list[City],
-        positions: list[Position],
+    def _resume_row_to_entity(
+        resume: dict,
+        author: dict,
+        hobbies: list[str],
+        hiring_cities: list[dict],
+        positions: list[dict],
     ) -> e.Resume:
         return e.Resume(
-            id=resume.uid,
-            first_name=resume.first_name,
-            last_name=resume.last_name,
-            age=resume.age,
-            date_created=resume.date_created.replace(tzinfo=None),
-            author=Neo4jRepository._user_model_to_entity(author),
+            id=resume['uid'],
+            first_name=resume['first_name'],
+            last_name=resume['last_name'],
+            age=resume['age'],
+            date_created=Resume.date_created.inflate(
+                resume['date_created']
+            ).replace(tzinfo=None),
+            author=e.User(
+                id=author['uid'],
+                login=author['login'],
+                password=author['password'],
+            ),
             hiring_cities=[
-                Neo4jRepository._city_model_to_entity(city)
+                e.City(name=city['name'], country=city['country'])
                 for city in hiring_cities
             ],
-            hobbies=[
-                Neo4jRepository._hobby_model_to_entity(hobby)
-                for hobby in hobbies
-            ],
+            hobbies=[e.Hobby(name=name) for name in hobbies],
             positions=[
-                Neo4jRepository._position_model_to_entity(position)
+                e.Position(
+                    job_title=position['job_title'],
+                    organization=position['organization'],
+                    date_start=Position.date_start.inflate(position['date_start']),
+                    date_end=(
+                        Position.date_end.inflate(position['date_end'])
+                        if position['date_end'] is not None else None
+                    ),
+                )
                 for position in positions
             ],
         )
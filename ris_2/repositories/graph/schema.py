@@ -0,0 +1,39 @@
+import argparse
+import sys
+from typing import TextIO
+
+from neomodel import db, install_all_labels
+
+# registers the node classes install_all_labels discovers
+from ris_2.repositories.graph import models  # noqa: F401
+from ris_2.settings import NEO4J_URI
+
+# indexes neomodel can't declare on a single property, name -> (label, properties)
+COMPOSITE_INDEXES = {
+    'city_name_country': ('City', ('name', 'country')),
+}
+
+
+def install_indexes(stdout: TextIO | None = None) -> None:
+    """
+    The indexes and constraints declared on the models, then the
+    composite ones. Existing indexes are kept, so it can be run again.
+    """
+    install_all_labels(stdout)
+    for name, (label, properties) in COMPOSITE_INDEXES.items():
+        columns = ', '.join(f'node.{prop}' for prop in properties)
+        db.cypher_query(f'CREATE INDEX {name} IF NOT EXISTS FOR (node: {label}) ON ({columns})')
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.repositories.graph.schema')
+    parser.add_argument('command', choices=['install'])
+    parser.parse_args(argv)
+
+    db.set_connection(NEO4J_URI)
+    install_indexes(sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+from ris_2.repositories.memory.repository import MemoryRepository
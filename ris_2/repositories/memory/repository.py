@@ -0,0 +1,239 @@
+from bisect import bisect_left, bisect_right, insort
+from copy import deepcopy
+from datetime import date
+from threading import RLock
+from typing import Iterator
+from uuid import uuid4
+
+from ris_2 import entities as e
+
+
+class MemoryRepository:
+    """
+    Keeps everything in process memory behind hash indexes,
+    so every query is an index lookup instead of a scan.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+
+        self._users: dict[str, e.User] = {}
+        self._resumes: dict[str, e.Resume] = {}
+
+        # ascending by (date_created, id), read in reverse
+        self._resumes_by_date: list[e.Resume] = []
+        self._resumes_by_author: dict[str, list[e.Resume]] = {}
+        self._resume_ids_by_city: dict[tuple[str, str], set[str]] = {}
+        self._resume_ids_by_hobby: dict[str, set[str]] = {}
+        self._users_by_organization: dict[str, dict[str, e.User]] = {}
+        self._organizations_by_user: dict[str, set[str]] = {}
+        # organization -> (date_start, date_end, user id) ascending,
+        # date.max stands for an active position
+        self._periods_by_organization: dict[str, list[tuple[date, date, str]]] = {}
+        # city -> hobby -> number of resumes with both
+        self._hobby_counts_by_city: dict[tuple[str, str], dict[str, int]] = {}
+
+    def fetch_resume(self, id_: str) -> e.Resume:
+        return deepcopy(self._resumes[id_])
+
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        with self._lock:
+            resumes = MemoryRepository._page(self._resumes_by_date, limit, after)
+        return deepcopy(resumes)
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        with self._lock:
+            resumes = MemoryRepository._page(
+                self._resumes_by_author.get(author_id, []),
+                limit,
+                after,
+            )
+        return deepcopy(resumes)
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[e.Resume]:
+        with self._lock:
+            resumes = list(self._resumes.values())
+        for resume in resumes:
+            yield deepcopy(resume)
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[e.Resume]:
+        with self._lock:
+            resumes = list(reversed(self._resumes_by_author.get(author_id, [])))
+        for resume in resumes:
+            yield deepcopy(resume)
+
+    def fetch_all_hobbies(self) -> list[e.Hobby]:
+        with self._lock:
+            names = sorted(self._resume_ids_by_hobby)
+        return [e.Hobby(name) for name in names]
+
+    def fetch_all_cities(self) -> list[e.City]:
+        with self._lock:
+            keys = sorted(self._resume_ids_by_city, key=lambda key: (key[1], key[0]))
+        return [e.City(name=name, country=country) for country, name in keys]
+
+    def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        with self._lock:
+            names = sorted(
+                self._hobby_counts_by_city.get((city.country, city.name), {})
+            )
+        return [e.Hobby(name) for name in names]
+
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        with self._lock:
+            return {
+                name: [
+                    deepcopy(user)
+                    for user in sorted(users.values(), key=lambda user: user.login)
+                ]
+                for name, users in sorted(self._users_by_organization.items())
+                if organization is None or name == organization
+            }
+
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        with self._lock:
+            if overlapping:
+                own_periods: dict[str, list[tuple[date, date]]] = {}
+                for resume in self._resumes_by_author.get(user_id, []):
+                    for position in resume.positions:
+                        own_periods.setdefault(position.organization, []).append(
+                            (position.date_start, position.date_end or date.max)
+                        )
+                coworkers = {
+                    coworker_id: self._users[coworker_id]
+                    for organization, own in own_periods.items()
+                    for coworker_id in MemoryRepository._overlapping_users(
+                        self._periods_by_organization[organization],
+                        own,
+                    )
+                    if coworker_id != user_id
+                }
+            else:
+                coworkers = {
+                    coworker.id: coworker
+                    for organization in self._organizations_by_user.get(user_id, ())
+                    for coworker in self._users_by_organization[organization].values()
+                    if coworker.id != user_id
+                }
+            return [
+                deepcopy(user)
+                for user in sorted(coworkers.values(), key=lambda user: user.login)
+            ]
+
+    def save_user(self, user: e.User) -> None:
+        user.id = uuid4().hex
+        with self._lock:
+            self._users[user.id] = deepcopy(user)
+
+    def save_resume(self, resume: e.Resume) -> None:
+        """
+        Will update resume.id!
+        """
+        resume.id = uuid4().hex
+        with self._lock:
+            self._index_resume(deepcopy(resume))
+
+    def save_users(self, users: list[e.User]) -> None:
+        for user in users:
+            self.save_user(user)
+
+    def save_resumes(self, resumes: list[e.Resume]) -> None:
+        for resume in resumes:
+            self.save_resume(resume)
+
+    def _index_resume(self, resume: e.Resume) -> None:
+        resume.author = self._users[resume.author.id]
+        resume.hiring_cities.sort(key=lambda city: city.name)
+        resume.hobbies.sort(key=lambda hobby: hobby.name)
+        resume.positions.sort(key=lambda position: position.date_start)
+
+        self._resumes[resume.id] = resume
+        insort(self._resumes_by_date, resume, key=MemoryRepository._resume_key)
+        insort(
+            self._resumes_by_author.setdefault(resume.author.id, []),
+            resume,
+            key=MemoryRepository._resume_key,
+        )
+
+        for city in resume.hiring_cities:
+            city_key = (city.country, city.name)
+            self._resume_ids_by_city.setdefault(city_key, set()).add(resume.id)
+            hobby_counts = self._hobby_counts_by_city.setdefault(city_key, {})
+            for hobby in resume.hobbies:
+                hobby_counts[hobby.name] = hobby_counts.get(hobby.name, 0) + 1
+
+        for hobby in resume.hobbies:
+            self._resume_ids_by_hobby.setdefault(hobby.name, set()).add(resume.id)
+
+        for position in resume.positions:
+            users = self._users_by_organization.setdefault(position.organization, {})
+            users[resume.author.id] = resume.author
+            organizations = self._organizations_by_user.setdefault(resume.author.id, set())
+            organizations.add(position.organization)
+            insort(
+                self._periods_by_organization.setdefault(position.organization, []),
+                (position.date_start, position.date_end or date.max, resume.author.id),
+            )
+
+    @staticmethod
+    def _overlapping_users(
+        periods: list[tuple[date, date, str]],
+        own: list[tuple[date, date]],
+    ) -> set[str]:
+        """
+        Sweeps the periods of an organization in start order against the own
+        periods merged into disjoint ascending ranges: the only range that can
+        overlap a period is the last one starting before the period ends.
+        Periods starting after the last range ends are never visited.
+        """
+        ranges: list[list[date]] = []
+        for start, end in sorted(own):
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        starts = [start for start, _ in ranges]
+
+        stop = bisect_right(periods, ranges[-1][1], key=lambda period: period[0])
+        users = set()
+        for start, end, user_id in periods[:stop]:
+            i = bisect_right(starts, end) - 1
+            if i >= 0 and ranges[i][1] >= start:
+                users.add(user_id)
+        return users
+
+    @staticmethod
+    def _resume_key(resume: e.Resume) -> tuple:
+        return resume.date_created, resume.id
+
+    @staticmethod
+    def _page(
+        resumes: list[e.Resume],
+        limit: int | None,
+        after: e.ResumeCursor | None,
+    ) -> list[e.Resume]:
+        end = len(resumes)
+        if after is not None:
+            end = bisect_left(
+                resumes,
+                (after.date_created, after.id),
+                key=MemoryRepository._resume_key,
+            )
+        start = 0 if limit is None else max(end - limit, 0)
+        return resumes[start:end][::-1]
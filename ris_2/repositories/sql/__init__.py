@@ -1 +1,2 @@
 from ris_2.repositories.sql.repository import SqlRepository
+from ris_2.repositories.sql.async_repository import AsyncSqlRepository
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from ris_2.settings import SQLALCHEMY_ASYNC_URI
+
+
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_URI)
+async_session_factory = sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
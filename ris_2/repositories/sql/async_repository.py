@@ -0,0 +1,83 @@
+from typing import Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ris_2 import entities as e
+from ris_2.repositories.sql.repository import SqlRepository
+
+T = TypeVar('T')
+
+
+class AsyncSqlRepository:
+    """
+    Runs SqlRepository queries through AsyncSession.run_sync, so the
+    event loop is never blocked. Every call opens its own session,
+    which lets independent calls run concurrently with asyncio.gather.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self._session_factory = session_factory
+
+    async def fetch_resume(self, id_: str) -> e.Resume:
+        return await self._read(lambda repo: repo.fetch_resume(id_))
+
+    async def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._read(lambda repo: repo.fetch_resumes(limit, after))
+
+    async def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        return await self._read(
+            lambda repo: repo.fetch_resumes_by_author(author_id, limit, after)
+        )
+
+    async def fetch_all_hobbies(self) -> list[e.Hobby]:
+        return await self._read(SqlRepository.fetch_all_hobbies)
+
+    async def fetch_all_cities(self) -> list[e.City]:
+        return await self._read(SqlRepository.fetch_all_cities)
+
+    async def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
+        return await self._read(lambda repo: repo.fetch_hobbies_by_city(city))
+
+    async def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        return await self._read(
+            lambda repo: repo.fetch_users_grouped_by_organization(organization)
+        )
+
+    async def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        return await self._read(lambda repo: repo.fetch_coworkers(user_id, overlapping))
+
+    async def save_user(self, user: e.User) -> None:
+        await self._write(lambda repo: repo.save_user(user))
+
+    async def save_resume(self, resume: e.Resume) -> None:
+        await self._write(lambda repo: repo.save_resume(resume))
+
+    async def save_users(self, users: list[e.User]) -> None:
+        await self._write(lambda repo: repo.save_users(users))
+
+    async def save_resumes(self, resumes: list[e.Resume]) -> None:
+        await self._write(lambda repo: repo.save_resumes(resumes))
+
+    async def _read(self, method: Callable[[SqlRepository], T]) -> T:
+        async with self._session_factory() as session:
+            return await session.run_sync(
+                lambda sync_session: method(SqlRepository(sync_session))
+            )
+
+    async def _write(self, method: Callable[[SqlRepository], T]) -> T:
+        async with self._session_factory() as session, session.begin():
+            return await session.run_sync(
+                lambda sync_session: method(SqlRepository(sync_session))
+            )
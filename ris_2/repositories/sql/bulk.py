@@ -0,0 +1,230 @@
+import argparse
+import sys
+from io import StringIO
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, DatasetGenerator
+from ris_2.utils import chunked
+from ris_2.repositories.sql.core import Base, engine
+# registers the tables on Base.metadata
+from ris_2.repositories.sql import models  # noqa: F401
+
+# rows of a batch are linked to their resume by its position in the batch
+STAGING_TABLES = {
+    'stage_users': '''
+        login varchar(120) NOT NULL,
+        password varchar(120) NOT NULL
+    ''',
+    'stage_resumes': '''
+        seq integer NOT NULL,
+        id integer,
+        login varchar(120) NOT NULL,
+        first_name varchar(120) NOT NULL,
+        last_name varchar(120) NOT NULL,
+        age integer NOT NULL,
+        date_created timestamp NOT NULL
+    ''',
+    'stage_positions': '''
+        seq integer NOT NULL,
+        job_title varchar(120) NOT NULL,
+        organization varchar(120) NOT NULL,
+        date_start date NOT NULL,
+        date_end date
+    ''',
+    'stage_resume_cities': '''
+        seq integer NOT NULL,
+        name varchar(120) NOT NULL,
+        country varchar(120) NOT NULL
+    ''',
+    'stage_resume_hobbies': '''
+        seq integer NOT NULL,
+        name varchar(120) NOT NULL
+    ''',
+}
+
+MERGE_STAGED = (
+    '''
+    INSERT INTO users (login, password)
+    SELECT DISTINCT ON (login) login, password FROM stage_users
+    ON CONFLICT (login) DO NOTHING
+    ''',
+    '''
+    INSERT INTO cities (name, country)
+    SELECT DISTINCT name, country FROM stage_resume_cities
+    ON CONFLICT (name, country) DO NOTHING
+    ''',
+    '''
+    INSERT INTO hobbies (name)
+    SELECT DISTINCT name FROM stage_resume_hobbies
+    ON CONFLICT (name) DO NOTHING
+    ''',
+    '''
+    INSERT INTO organizations (name)
+    SELECT DISTINCT organization FROM stage_positions
+    ON CONFLICT (name) DO NOTHING
+    ''',
+    '''
+    UPDATE stage_resumes SET id = nextval(pg_get_serial_sequence('resumes', 'id'))
+    ''',
+    '''
+    INSERT INTO resumes (id, first_name, last_name, age, date_created, author_id)
+    SELECT resume.id, resume.first_name, resume.last_name, resume.age,
+        resume.date_created, users.id
+    FROM stage_resumes resume
+    JOIN users ON users.login = resume.login
+    ''',
+    '''
+    INSERT INTO positions (
+        job_title, organization, organization_id, date_start, date_end, employee_id
+    )
+    SELECT position.job_title, position.organization, organizations.id,
+        position.date_start, position.date_end, resume.id
+    FROM stage_positions position
+    JOIN stage_resumes resume ON resume.seq = position.seq
+    JOIN organizations ON organizations.name = position.organization
+    ''',
+    '''
+    INSERT INTO organization_members (organization_id, user_id)
+    SELECT DISTINCT organizations.id, users.id
+    FROM stage_positions position
+    JOIN stage_resumes resume ON resume.seq = position.seq
+    JOIN organizations ON organizations.name = position.organization
+    JOIN users ON users.login = resume.login
+    ON CONFLICT DO NOTHING
+    ''',
+    '''
+    INSERT INTO resume_to_city (resume_id, city_id)
+    SELECT DISTINCT resume.id, cities.id
+    FROM stage_resume_cities city
+    JOIN stage_resumes resume ON resume.seq = city.seq
+    JOIN cities ON cities.name = city.name AND cities.country = city.country
+    ''',
+    '''
+    INSERT INTO resume_to_hobby (resume_id, hobby_id)
+    SELECT DISTINCT resume.id, hobbies.id
+    FROM stage_resume_hobbies hobby
+    JOIN stage_resumes resume ON resume.seq = hobby.seq
+    JOIN hobbies ON hobbies.name = hobby.name
+    ''',
+)
+
+
+def copy_resumes(
+    connection: Connection,
+    resumes: Iterable[e.Resume],
+    batch_size: int = 10_000,
+) -> int:
+    """
+    Loads resumes with their authors, positions, cities and hobbies
+    through COPY into temporary staging tables, merging every batch
+    with set-based statements. The input is consumed lazily, batch_size
+    resumes at a time. Runs in the caller's transaction; ids of the
+    entities are not updated. Returns the number of loaded resumes.
+    """
+    for table, columns in STAGING_TABLES.items():
+        connection.execute(text(f'CREATE TEMP TABLE IF NOT EXISTS {table} ({columns}) ON COMMIT DROP'))
+
+    cursor = connection.connection.cursor()
+    loaded = 0
+    try:
+        for batch in chunked(resumes, batch_size):
+            _stage(cursor, batch)
+            for statement in MERGE_STAGED:
+                connection.execute(text(statement))
+            connection.execute(text(f'TRUNCATE {", ".join(STAGING_TABLES)}'))
+            loaded += len(batch)
+    finally:
+        cursor.close()
+
+    return loaded
+
+
+def _stage(cursor, batch: list[e.Resume]) -> None:
+    authors = {resume.author.login: resume.author for resume in batch}
+    _copy(cursor, 'stage_users', (
+        (author.login, author.password) for author in authors.values()
+    ))
+    _copy(cursor, 'stage_resumes', (
+        (
+            seq, None, resume.author.login, resume.first_name,
+            resume.last_name, resume.age, resume.date_created,
+        )
+        for seq, resume in enumerate(batch)
+    ))
+    _copy(cursor, 'stage_positions', (
+        (
+            seq, position.job_title, position.organization,
+            position.date_start, position.date_end,
+        )
+        for seq, resume in enumerate(batch)
+        for position in resume.positions
+    ))
+    _copy(cursor, 'stage_resume_cities', (
+        (seq, city.name, city.country)
+        for seq, resume in enumerate(batch)
+        for city in resume.hiring_cities
+    ))
+    _copy(cursor, 'stage_resume_hobbies', (
+        (seq, hobby.name)
+        for seq, resume in enumerate(batch)
+        for hobby in resume.hobbies
+    ))
+
+
+def _copy(cursor, table: str, rows: Iterable[tuple]) -> None:
+    buffer = StringIO()
+    for row in rows:
+        buffer.write('\t'.join(map(_copy_value, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f'COPY {table} FROM STDIN', buffer)
+
+
+def _copy_value(value) -> str:
+    """
+    A value in COPY text format.
+    """
+    if value is None:
+        return '\\N'
+
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m ris_2.repositories.sql.bulk',
+        description='load a generated dataset with COPY',
+    )
+    parser.add_argument('--users', type=int, required=True)
+    parser.add_argument('--resumes-per-user', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generator = DatasetGenerator(DatasetConfig(
+        users=args.users,
+        resumes_per_user=args.resumes_per_user,
+        seed=args.seed,
+    ))
+    resumes = (resume for _, user_resumes in generator for resume in user_resumes)
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        loaded = copy_resumes(connection, resumes, args.batch_size)
+
+    print(f'loaded {loaded} resumes', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
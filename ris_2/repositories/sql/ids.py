@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, Hashable, Iterable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+K = TypeVar('K', bound=Hashable)
+
+PENDING_IDS_KEY = 'ris_2.pending_ids'
+
+
+class IdCache(Generic[K]):
+    """
+    Bounded, thread-safe LRU map from a natural key to a row id.
+
+    Ids are only published once the outermost transaction that resolved them
+    commits, so a rolled back insert, savepoints included, never leaves
+    a dangling id behind.
+    Rows are assumed to be never deleted; dropping the table clears the cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ids: OrderedDict[K, int] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get_many(self, session: Session, keys: Iterable[K]) -> dict[K, int]:
+        pending = self._pending(session)
+        found = {}
+        with self._lock:
+            for key in keys:
+                for ids in pending:
+                    if key in ids:
+                        found[key] = ids[key]
+                        break
+                else:
+                    if key in self._ids:
+                        self._ids.move_to_end(key)
+                        found[key] = self._ids[key]
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+        return found
+
+    def put_many(self, session: Session, ids: dict[K, int]) -> None:
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        pending = session.info.setdefault(PENDING_IDS_KEY, {})
+        pending.setdefault(transaction, {}).setdefault(self, {}).update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+    def _publish(self, ids: dict[K, int]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+            for key in ids:
+                self._ids.move_to_end(key)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def _pending(self, session: Session) -> list[dict[K, int]]:
+        """
+        Ids resolved by the open transactions of the session, innermost first.
+        """
+        return [
+            caches[self]
+            for caches in reversed(session.info.get(PENDING_IDS_KEY, {}).values())
+            if self in caches
+        ]
+
+
+def _within(transaction: SessionTransaction, ancestor: SessionTransaction) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_ids(session: Session) -> None:
+    if session.get_nested_transaction() is not None:
+        # a released SAVEPOINT, its ids wait for the outermost commit
+        return
+    for caches in session.info.pop(PENDING_IDS_KEY, {}).values():
+        for cache, ids in caches.items():
+            cache._publish(ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_ids(session: Session, previous_transaction: SessionTransaction) -> None:
+    # fired for savepoints too, ids resolved outside of them stay pending
+    pending = session.info.get(PENDING_IDS_KEY, {})
+    for transaction in list(pending):
+        if _within(transaction, previous_transaction):
+            del pending[transaction]
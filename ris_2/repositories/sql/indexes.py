@@ -0,0 +1,159 @@
+import argparse
+import sys
+
+from sqlalchemy import Index, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from sqlalchemy.sql import Select
+
+from ris_2.repositories.sql.core import Base, engine
+# registers the tables on Base.metadata
+from ris_2.repositories.sql import models  # noqa: F401
+
+
+def missing_primary_keys(connection: Connection) -> list[Table]:
+    inspector = inspect(connection)
+    return [
+        table
+        for table in Base.metadata.sorted_tables
+        if inspector.has_table(table.name)
+        and table.primary_key.columns
+        and not inspector.get_pk_constraint(table.name)['constrained_columns']
+    ]
+
+
+def missing_indexes(connection: Connection) -> list[Index]:
+    inspector = inspect(connection)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(
+            index
+            for index in sorted(table.indexes, key=lambda index: index.name)
+            if index.name not in existing
+        )
+    return missing
+
+
+def invalid_indexes(connection: Connection) -> list[str]:
+    """
+    Indexes left unusable by a failed CREATE INDEX CONCURRENTLY.
+    """
+    return list(connection.execute(text(
+        '''
+        SELECT index_class.relname
+        FROM pg_index
+        JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+        WHERE NOT pg_index.indisvalid
+        ORDER BY index_class.relname
+        '''
+    )).scalars())
+
+
+def verify_indexes(connection: Connection) -> list[str]:
+    return [
+        *(f'missing primary key on {table.name}' for table in missing_primary_keys(connection)),
+        *(f'missing index {index.name} on {index.table.name}' for index in missing_indexes(connection)),
+        *(f'invalid index {name}' for name in invalid_indexes(connection)),
+    ]
+
+
+def ensure_indexes(connection: Connection, concurrently: bool = False) -> list[str]:
+    """
+    Brings an existing database up to the declared schema: adds the
+    primary keys of association tables (dropping duplicate links first)
+    and creates missing indexes. CONCURRENTLY doesn't lock writes,
+    but needs a connection in AUTOCOMMIT mode.
+    Returns the applied changes.
+    """
+    applied = []
+    preparer = connection.dialect.identifier_preparer
+
+    for table in missing_primary_keys(connection):
+        columns = [column.name for column in table.primary_key.columns]
+        connection.execute(text(
+            f'''
+            DELETE FROM {preparer.quote(table.name)} duplicate
+            USING {preparer.quote(table.name)} original
+            WHERE duplicate.ctid > original.ctid
+                AND {' AND '.join(
+                    f'duplicate.{preparer.quote(column)} = original.{preparer.quote(column)}'
+                    for column in columns
+                )}
+            '''
+        ))
+        connection.execute(AddConstraint(table.primary_key))
+        applied.append(f'added primary key on {table.name}')
+
+    missing = missing_indexes(connection)
+    if missing:
+        for extension in models.EXTENSIONS:
+            connection.execute(text(f'CREATE EXTENSION IF NOT EXISTS {extension}'))
+
+    for index in missing:
+        if concurrently:
+            create = str(CreateIndex(index).compile(dialect=connection.dialect))
+            connection.execute(text(
+                create.replace('INDEX ', 'INDEX CONCURRENTLY IF NOT EXISTS ', 1)
+            ))
+        else:
+            index.create(connection)
+        applied.append(f'created index {index.name} on {index.table.name}')
+
+    return applied
+
+
+def explain(connection: Connection, query: Select) -> dict:
+    compiled = query.compile(
+        dialect=connection.dialect,
+        compile_kwargs={'render_postcompile': True},
+    )
+    result = connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}',
+        compiled.params,
+    )
+    (plan,) = result.scalar_one()
+    return plan['Plan']
+
+
+def used_indexes(plan: dict) -> set[str]:
+    indexes = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        indexes |= used_indexes(child)
+    return indexes
+
+
+def sequential_scans(plan: dict) -> set[str]:
+    tables = {plan['Relation Name']} if plan['Node Type'] == 'Seq Scan' else set()
+    for child in plan.get('Plans', []):
+        tables |= sequential_scans(child)
+    return tables
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.repositories.sql.indexes')
+    parser.add_argument('command', choices=('ensure', 'verify'))
+    parser.add_argument('--concurrently', action='store_true')
+    args = parser.parse_args(argv)
+
+    match args.command:
+        case 'ensure' if args.concurrently:
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                changes = ensure_indexes(connection, concurrently=True)
+        case 'ensure':
+            with engine.begin() as connection:
+                changes = ensure_indexes(connection)
+        case _:
+            with engine.connect() as connection:
+                changes = verify_indexes(connection)
+
+    for change in changes:
+        print(change)
+    return 1 if args.command == 'verify' and changes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
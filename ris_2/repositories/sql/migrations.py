@@ -0,0 +1,80 @@
+import argparse
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from ris_2.repositories.sql.core import Base, engine
+from ris_2.repositories.sql.indexes import ensure_indexes
+from ris_2.repositories.sql.models import organization_members
+from ris_2.repositories.sql.read_models import rebuild_organization_members
+
+
+def migrate_organizations(connection: Connection) -> list[str]:
+    """
+    Brings a database created before the organizations table existed
+    to the declared schema: fills organizations from the names on positions,
+    links every position to its organization and rebuilds organization_members
+    keyed by organization id. Safe to run again. Returns the applied changes.
+    """
+    applied = []
+    Base.metadata.create_all(connection)
+    inspector = inspect(connection)
+
+    position_columns = {column['name'] for column in inspector.get_columns('positions')}
+    if 'organization_id' not in position_columns:
+        connection.execute(text(
+            'ALTER TABLE positions ADD COLUMN organization_id integer REFERENCES organizations (id)'
+        ))
+        applied.append('added positions.organization_id')
+
+    result = connection.execute(text(
+        '''
+        INSERT INTO organizations (name)
+        SELECT DISTINCT organization FROM positions
+        WHERE organization_id IS NULL
+        ON CONFLICT (name) DO NOTHING
+        '''
+    ))
+    applied.append(f'inserted {result.rowcount} organizations')
+    result = connection.execute(text(
+        '''
+        UPDATE positions SET organization_id = organizations.id
+        FROM organizations
+        WHERE positions.organization_id IS NULL
+            AND organizations.name = positions.organization
+        '''
+    ))
+    applied.append(f'linked {result.rowcount} positions')
+    connection.execute(text('ALTER TABLE positions ALTER COLUMN organization_id SET NOT NULL'))
+    connection.execute(text('DROP INDEX IF EXISTS ix_positions_organization_employee_id'))
+
+    member_columns = {
+        column['name']
+        for column in inspector.get_columns(organization_members.name)
+    }
+    if 'organization_id' not in member_columns:
+        connection.execute(text(f'DROP TABLE {organization_members.name}'))
+        organization_members.create(connection)
+        rows = rebuild_organization_members(connection)
+        applied.append(f'rebuilt organization_members: {rows} rows')
+
+    applied.extend(ensure_indexes(connection))
+    return applied
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.repositories.sql.migrations')
+    parser.add_argument('migration', choices=['organizations'])
+    parser.parse_args(argv)
+
+    with engine.begin() as connection:
+        changes = migrate_organizations(connection)
+
+    for change in changes:
+        print(change, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,55 @@
 from datetime import datetime
 
-from sqlalchemy import Table, Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    Table,
+    Column,
+    Integer,
+    String,
+    Date,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+    Index,
+    event,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import DATERANGE, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.orderinglist import ordering_list
 
 from ris_2.repositories.sql.core import Base
 
+# GiST indexes mixing scalar and range columns need btree_gist
+EXTENSIONS = ('btree_gist',)
+for extension in EXTENSIONS:
+    event.listen(Base.metadata, 'before_create', DDL(f'CREATE EXTENSION IF NOT EXISTS {extension}'))
+
 resume_to_city = Table(
     'resume_to_city',
     Base.metadata,
-    Column('resume_id', Integer, ForeignKey('resumes.id')),
-    Column('city_id', Integer, ForeignKey('cities.id')),
+    Column('resume_id', Integer, ForeignKey('resumes.id'), primary_key=True),
+    Column('city_id', Integer, ForeignKey('cities.id'), primary_key=True),
+    Index('ix_resume_to_city_city_id_resume_id', 'city_id', 'resume_id'),
 )
 
 resume_to_hobby = Table(
     'resume_to_hobby',
     Base.metadata,
-    Column('resume_id', Integer, ForeignKey('resumes.id')),
-    Column('hobby_id', Integer, ForeignKey('hobbies.id')),
+    Column('resume_id', Integer, ForeignKey('resumes.id'), primary_key=True),
+    Column('hobby_id', Integer, ForeignKey('hobbies.id'), primary_key=True),
+    Index('ix_resume_to_hobby_hobby_id_resume_id', 'hobby_id', 'resume_id'),
+)
+
+# read model of fetch_users_grouped_by_organization and fetch_coworkers,
+# maintained on every resume save
+organization_members = Table(
+    'organization_members',
+    Base.metadata,
+    Column('organization_id', Integer, ForeignKey('organizations.id'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    Index('ix_organization_members_user_id_organization_id', 'user_id', 'organization_id'),
 )
 
 
@@ -39,12 +71,25 @@ class City(Base):
     country = Column(String(120), nullable=False)
 
 
+class Organization(Base):
+    __tablename__ = 'organizations'
+
+    id = Column(Integer, nullable=False, primary_key=True)
+    name = Column(String(120), nullable=False, unique=True)
+
+
 class Position(Base):
     __tablename__ = 'positions'
+    __table_args__ = (
+        Index('ix_positions_employee_id', 'employee_id'),
+        Index('ix_positions_organization_id_employee_id', 'organization_id', 'employee_id'),
+    )
 
     id = Column(Integer, nullable=False, primary_key=True)
     job_title = Column(String(120), nullable=False)
+    # copy of organizations.name, so resumes are read without joining organizations
     organization = Column(String(120), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
     date_start = Column(Date, nullable=False)
     date_end = Column(Date, nullable=True)
 
@@ -53,6 +98,27 @@ class Position(Base):
     employee = relationship('Resume', back_populates='positions')
 
 
+def position_period(position=Position):
+    """
+    The closed [date_start, date_end] range of a position, unbounded while it is active.
+    Queries must build it exactly like this to use ix_positions_organization_id_period.
+    """
+    return func.daterange(
+        position.date_start,
+        position.date_end,
+        literal_column("'[]'"),
+        type_=DATERANGE,
+    )
+
+
+Index(
+    'ix_positions_organization_id_period',
+    Position.organization_id,
+    position_period(),
+    postgresql_using='gist',
+)
+
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -63,6 +129,10 @@ class User(Base):
 
 class Resume(Base):
     __tablename__ = 'resumes'
+    __table_args__ = (
+        Index('ix_resumes_date_created_id', 'date_created', 'id'),
+        Index('ix_resumes_author_id_date_created_id', 'author_id', 'date_created', 'id'),
+    )
 
     id = Column(Integer, nullable=False, primary_key=True)
     first_name = Column(String(120), nullable=False)
@@ -92,3 +162,27 @@ class Resume(Base):
         order_by='Hobby.name',
         collection_class=ordering_list('name'),
     )
+
+
+class ResumeDocument(Base):
+    """
+    Optional read model: the fully assembled resume, one row per resume.
+    """
+    __tablename__ = 'resume_documents'
+    __table_args__ = (
+        Index(
+            'ix_resume_documents_author_id_date_created_resume_id',
+            'author_id', 'date_created', 'resume_id',
+        ),
+        Index(
+            'ix_resume_documents_document',
+            'document',
+            postgresql_using='gin',
+            postgresql_ops={'document': 'jsonb_path_ops'},
+        ),
+    )
+
+    resume_id = Column(Integer, ForeignKey('resumes.id'), primary_key=True)
+    author_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    date_created = Column(DateTime, nullable=False)
+    document = Column(JSONB, nullable=False)
@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ris_2.repositories.sql.core import Base, engine
+# registers the tables on Base.metadata
+from ris_2.repositories.sql import models  # noqa: F401
+
+
+def rebuild_organization_members(connection: Connection) -> int:
+    """
+    Refills organization_members from positions, e.g. for a database
+    created before the table existed. Returns the number of rows.
+    """
+    connection.execute(text('TRUNCATE organization_members'))
+    result = connection.execute(text(
+        '''
+        INSERT INTO organization_members (organization_id, user_id)
+        SELECT DISTINCT positions.organization_id, resumes.author_id
+        FROM positions
+        JOIN resumes ON resumes.id = positions.employee_id
+        '''
+    ))
+    return result.rowcount
+
+
+# resume_documents rows built from the normalized tables; the children are
+# sorted by PostgreSQL, in the same collation as the normalized reads
+INSERT_RESUME_DOCUMENTS = '''
+INSERT INTO resume_documents (resume_id, author_id, date_created, document)
+SELECT resumes.id, resumes.author_id, resumes.date_created, jsonb_build_object(
+    'id', resumes.id::text,
+    'first_name', resumes.first_name,
+    'last_name', resumes.last_name,
+    'age', resumes.age,
+    -- always six fractional digits, as datetime.fromisoformat expects
+    'date_created', to_char(resumes.date_created, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+    'author', jsonb_build_object(
+        'id', users.id::text,
+        'login', users.login,
+        'password', users.password
+    ),
+    'hiring_cities', coalesce((
+        SELECT jsonb_agg(
+            jsonb_build_object('name', cities.name, 'country', cities.country)
+            ORDER BY cities.name
+        )
+        FROM resume_to_city
+        JOIN cities ON cities.id = resume_to_city.city_id
+        WHERE resume_to_city.resume_id = resumes.id
+    ), '[]'),
+    'positions', coalesce((
+        SELECT jsonb_agg(
+            jsonb_build_object(
+                'job_title', positions.job_title,
+                'organization', positions.organization,
+                'date_start', positions.date_start,
+                'date_end', positions.date_end
+            )
+            ORDER BY positions.date_start
+        )
+        FROM positions
+        WHERE positions.employee_id = resumes.id
+    ), '[]'),
+    'hobbies', coalesce((
+        SELECT jsonb_agg(hobbies.name ORDER BY hobbies.name)
+        FROM resume_to_hobby
+        JOIN hobbies ON hobbies.id = resume_to_hobby.hobby_id
+        WHERE resume_to_hobby.resume_id = resumes.id
+    ), '[]')
+)
+FROM resumes
+JOIN users ON users.id = resumes.author_id
+'''
+
+
+def rebuild_resume_documents(connection: Connection) -> int:
+    """
+    Refills resume_documents from the normalized tables,
+    e.g. after enabling the read model or a COPY load.
+    Returns the number of rows.
+    """
+    connection.execute(text('TRUNCATE resume_documents'))
+    result = connection.execute(text(INSERT_RESUME_DOCUMENTS))
+    return result.rowcount
+
+
+def insert_resume_documents(connection: Connection, resume_ids: list[int]) -> None:
+    """
+    Builds the documents of just saved resumes the way the rebuild does.
+    """
+    connection.execute(
+        text(f'{INSERT_RESUME_DOCUMENTS}WHERE resumes.id = ANY(:resume_ids)'),
+        {'resume_ids': resume_ids},
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ris_2.repositories.sql.read_models')
+    parser.add_argument('command', choices=['rebuild'])
+    parser.parse_args(argv)
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        rows = rebuild_organization_members(connection)
+        print(f'organization_members: {rows} rows', file=sys.stderr)
+        rows = rebuild_resume_documents(connection)
+        print(f'resume_documents: {rows} rows', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
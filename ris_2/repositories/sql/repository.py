@@ -1,101 +1,166 @@
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import Session, joinedload
+from datetime import date, datetime
+from typing import Iterator, Literal
+
+from sqlalchemy import JSON, and_, event, select, insert, func, literal_column, tuple_, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy.sql import Insert, Select
 
 from ris_2 import entities as e
-from ris_2.repositories.sql.models import Resume, User, City, Position, Hobby
+from ris_2.utils import chunked
+from ris_2.repositories.sql.ids import IdCache
+from ris_2.repositories.sql.read_models import insert_resume_documents
+from ris_2.repositories.sql.models import (
+    Resume,
+    User,
+    City,
+    Position,
+    Hobby,
+    Organization,
+    resume_to_city,
+    resume_to_hobby,
+    organization_members,
+    ResumeDocument,
+    position_period,
+)
+
+# How the children of a resume are loaded:
+#   joined   - one query, positions x cities x hobbies rows per resume
+#   selectin - one query per collection for the whole page
+#   json     - one query, children aggregated into JSON arrays by PostgreSQL
+#   core     - the json query run through Core, rows become entities directly,
+#              no ORM instances and no identity map
+Loading = Literal['joined', 'selectin', 'json', 'core']
 
 
 class SqlRepository:
-    def __init__(self, session: Session):
+    # PostgreSQL allows at most 65535 bind parameters per statement.
+    BULK_CHUNK_SIZE = 1000
+    # process-wide, shared by every repository
+    CITY_IDS: IdCache[tuple[str, str]] = IdCache(maxsize=100_000)
+    HOBBY_IDS: IdCache[str] = IdCache(maxsize=100_000)
+    ORGANIZATION_IDS: IdCache[str] = IdCache(maxsize=100_000)
+    RESUME_COLUMNS = (
+        Resume.__table__.c.id,
+        Resume.__table__.c.first_name,
+        Resume.__table__.c.last_name,
+        Resume.__table__.c.age,
+        Resume.__table__.c.date_created,
+        User.__table__.c.id,
+        User.__table__.c.login,
+        User.__table__.c.password,
+    )
+    LOADING: dict[str, Loading] = {
+        'fetch_resume': 'core',
+        'fetch_resumes': 'core',
+        'fetch_resumes_by_author': 'core',
+    }
+
+    def __init__(
+        self,
+        session: Session,
+        loading: dict[str, Loading] | None = None,
+        documents: bool = False,
+    ):
+        """
+        documents: maintain the resume_documents read model on writes and
+        serve fetch_resume, fetch_resumes_by_author and fetch_hobbies_by_city from it.
+        """
         self._session = session
+        self._loading = {**self.LOADING, **(loading or {})}
+        self._documents = documents
 
     def fetch_resume(self, id_: str) -> e.Resume:
-        resume = self._session.get(
-            Resume,
-            int(id_),
-            options=(
-                joinedload(Resume.author),
-                joinedload(Resume.positions),
-                joinedload(Resume.hiring_cities),
-                joinedload(Resume.hobbies),
+        if self._documents:
+            query = (
+                select(ResumeDocument.document)
+                .where(ResumeDocument.resume_id == int(id_))
             )
-        )
-        return self._resume_model_to_entity(resume)
+            document = self._read(query).scalar_one()
+            return SqlRepository._resume_document_to_entity(document)
 
-    def fetch_resumes_by_author(self, author_id: str) -> list[e.Resume]:
-        query = (
-            select(Resume)
-            .options(
-                joinedload(Resume.author),
-                joinedload(Resume.positions),
-                joinedload(Resume.hiring_cities),
-                joinedload(Resume.hobbies),
-            )
-            .where(Resume.author_id == int(author_id))
-            .order_by(Resume.date_created.desc())
-        )
+        query = select(Resume).where(Resume.id == int(id_))
+        resume, = self._fetch_resumes(query, self._loading['fetch_resume'])
+        return resume
 
-        db_resumes = self._session.execute(query).scalars().unique().all()
-        return [
-            self._resume_model_to_entity(db_resume)
-            for db_resume in db_resumes
-        ]
+    def fetch_resumes(
+        self,
+        limit: int,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        query = SqlRepository.resumes_query(limit=limit, after=after)
+        return self._fetch_resumes(query, self._loading['fetch_resumes'])
+
+    def fetch_resumes_by_author(
+        self,
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> list[e.Resume]:
+        if self._documents:
+            query = SqlRepository.resume_documents_query(author_id, limit, after)
+            return [
+                SqlRepository._resume_document_to_entity(document)
+                for document in self._read(query).scalars()
+            ]
+
+        query = SqlRepository.resumes_query(author_id, limit, after)
+        return self._fetch_resumes(query, self._loading['fetch_resumes_by_author'])
+
+    def iter_resumes(self, batch_size: int = 1000) -> Iterator[e.Resume]:
+        query = select(Resume).order_by(Resume.id)
+        return self._stream_resumes(query, batch_size)
+
+    def iter_resumes_by_author(
+        self,
+        author_id: str,
+        batch_size: int = 1000,
+    ) -> Iterator[e.Resume]:
+        query = SqlRepository.resumes_query(author_id)
+        return self._stream_resumes(query, batch_size)
 
     def fetch_all_hobbies(self) -> list[e.Hobby]:
-        query = select(Hobby).order_by(Hobby.name)
-        hobbies = self._session.execute(query).scalars().all()
-        return [
-            SqlRepository._hobby_model_to_entity(hobby)
-            for hobby in hobbies
-        ]
+        query = select(Hobby.name).order_by(Hobby.name)
+        return [e.Hobby(name=name) for name, in self._read(query)]
 
     def fetch_all_cities(self) -> list[e.City]:
-        query = select(City).order_by(City.name)
-        cities = self._session.execute(query).scalars().all()
+        query = select(City.name, City.country).order_by(City.name)
         return [
-            SqlRepository._city_model_to_entity(city)
-            for city in cities
+            e.City(name=name, country=country)
+            for name, country in self._read(query)
         ]
 
     def fetch_hobbies_by_city(self, city: e.City) -> list[e.Hobby]:
-        query = (
-            select(Hobby)
-            .join(Hobby.resumes)
-            .join(Resume.hiring_cities)
-            .where(City.name == city.name)
-            .where(City.country == city.country)
-            .order_by(Hobby.name)
-        )
-        hobbies = self._session.execute(query).scalars().all()
-        return [
-            SqlRepository._hobby_model_to_entity(hobby)
-            for hobby in hobbies
-        ]
+        if self._documents:
+            query = SqlRepository.hobbies_by_city_documents_query(city)
+        else:
+            query = SqlRepository.hobbies_by_city_query(city)
+        return [e.Hobby(name=name) for name, in self._read(query)]
 
-    def fetch_users_grouped_by_organization(self) -> dict[str, list[e.User]]:
-        subquery = (
-            select(
-                Position.organization.label('organization'),
-                func.array_agg(User.id).label('user_ids')
-            )
-            .join(Position.employee)
-            .join(Resume.author)
-            .group_by(Position.organization)
-            .subquery()
-        )
-        query = (
-            select(User, subquery.c.organization)
-            .join(subquery, subquery.c.user_ids.any(User.id))
-            .order_by(subquery.c.organization, User.login)
-        )
+    def fetch_users_grouped_by_organization(
+        self,
+        organization: str | None = None,
+    ) -> dict[str, list[e.User]]:
+        query = SqlRepository.users_grouped_by_organization_query(organization)
 
         result: dict[str, list[e.User]] = {}
-        for user, organization in self._session.execute(query).all():
+        for id_, login, password, organization in self._read(query):
             users = result.setdefault(organization, [])
-            users.append(SqlRepository._user_model_to_entity(user))
+            users.append(e.User(id=str(id_), login=login, password=password))
 
         return result
 
+    def fetch_coworkers(self, user_id: str, overlapping: bool = False) -> list[e.User]:
+        if overlapping:
+            query = SqlRepository.overlapping_coworkers_query(user_id)
+        else:
+            query = SqlRepository.coworkers_query(user_id)
+        return [
+            e.User(id=str(id_), login=login, password=password)
+            for id_, login, password in self._read(query)
+        ]
+
     def save_user(self, user: e.User) -> None:
         db_user = User(
             login=user.login,
@@ -109,64 +174,446 @@ class SqlRepository:
         """
         Will update resume.id!
         """
-        positions = [
-            Position(
-                job_title=position.job_title,
-                organization=position.organization,
-                date_start=position.date_start,
-                date_end=position.date_end,
+        self.save_resumes([resume])
+
+    def save_users(self, users: list[e.User]) -> None:
+        for chunk in chunked(users, self.BULK_CHUNK_SIZE):
+            query = (
+                insert(User)
+                .values([
+                    {'login': user.login, 'password': user.password}
+                    for user in chunk
+                ])
+                .returning(User.id)
             )
+            ids = self._session.execute(query).scalars().all()
+            for user, id_ in zip(chunk, ids):
+                user.id = str(id_)
+
+    def save_resumes(self, resumes: list[e.Resume]) -> None:
+        """
+        Will update resume.id of every resume!
+        """
+        city_ids = self._get_or_create_city_ids([
+            city for resume in resumes for city in resume.hiring_cities
+        ])
+        hobby_ids = self._get_or_create_hobby_ids([
+            hobby for resume in resumes for hobby in resume.hobbies
+        ])
+        organization_ids = self._get_or_create_organization_ids([
+            position.organization
+            for resume in resumes
             for position in resume.positions
+        ])
+
+        for chunk in chunked(resumes, self.BULK_CHUNK_SIZE):
+            query = (
+                insert(Resume)
+                .values([
+                    {
+                        'first_name': resume.first_name,
+                        'last_name': resume.last_name,
+                        'age': resume.age,
+                        'date_created': resume.date_created,
+                        'author_id': int(resume.author.id),
+                    }
+                    for resume in chunk
+                ])
+                .returning(Resume.id)
+            )
+            resume_ids = self._session.execute(query).scalars().all()
+
+            positions = [
+                {
+                    'job_title': position.job_title,
+                    'organization': position.organization,
+                    'organization_id': organization_ids[position.organization],
+                    'date_start': position.date_start,
+                    'date_end': position.date_end,
+                    'employee_id': resume_id,
+                }
+                for resume, resume_id in zip(chunk, resume_ids)
+                for position in resume.positions
+            ]
+            resumes_cities = [
+                {
+                    'resume_id': resume_id,
+                    'city_id': city_ids[(city.country, city.name)],
+                }
+                for resume, resume_id in zip(chunk, resume_ids)
+                for city in resume.hiring_cities
+            ]
+            resumes_hobbies = [
+                {
+                    'resume_id': resume_id,
+                    'hobby_id': hobby_ids[hobby.name],
+                }
+                for resume, resume_id in zip(chunk, resume_ids)
+                for hobby in resume.hobbies
+            ]
+
+            if positions:
+                self._session.execute(insert(Position), positions)
+                # sorted, so concurrent writers lock the rows in one order
+                members = {
+                    (organization_ids[position.organization], int(resume.author.id))
+                    for resume in chunk
+                    for position in resume.positions
+                }
+                self._session.execute(
+                    pg_insert(organization_members)
+                    .values([
+                        {'organization_id': organization_id, 'user_id': user_id}
+                        for organization_id, user_id in sorted(members)
+                    ])
+                    .on_conflict_do_nothing()
+                )
+            if resumes_cities:
+                self._session.execute(insert(resume_to_city), resumes_cities)
+            if resumes_hobbies:
+                self._session.execute(insert(resume_to_hobby), resumes_hobbies)
+
+            if self._documents:
+                insert_resume_documents(self._session.connection(), resume_ids)
+
+            for resume, resume_id in zip(chunk, resume_ids):
+                resume.id = str(resume_id)
+
+    def _fetch_resumes(self, query: Select, loading: Loading) -> list[e.Resume]:
+        match loading:
+            case 'joined':
+                query = query.options(
+                    joinedload(Resume.author),
+                    joinedload(Resume.positions),
+                    joinedload(Resume.hiring_cities),
+                    joinedload(Resume.hobbies),
+                )
+                db_resumes = self._session.execute(query).scalars().unique().all()
+            case 'selectin':
+                query = query.options(
+                    joinedload(Resume.author),
+                    selectinload(Resume.positions),
+                    selectinload(Resume.hiring_cities),
+                    selectinload(Resume.hobbies),
+                )
+                db_resumes = self._session.execute(query).scalars().all()
+            case 'json':
+                query = (
+                    query
+                    .join(Resume.author)
+                    .add_columns(User, *SqlRepository._json_children())
+                )
+                return [
+                    self._resume_row_to_entity(*row)
+                    for row in self._session.execute(query)
+                ]
+            case 'core':
+                query = (
+                    query
+                    .with_only_columns(
+                        *SqlRepository.RESUME_COLUMNS,
+                        *SqlRepository._json_children(),
+                    )
+                    .join_from(Resume.__table__, User.__table__)
+                )
+                return [
+                    self._resume_tuple_to_entity(*row)
+                    for row in self._read(query)
+                ]
+            case _:
+                raise ValueError(f'Unknown loading strategy: {loading}')
+
+        return [
+            self._resume_model_to_entity(db_resume)
+            for db_resume in db_resumes
         ]
-        hiring_cities = self._get_or_create_cities(resume.hiring_cities)
-        hobbies = self._get_or_create_hobbies(resume.hobbies)
-        db_resume = Resume(
-            first_name=resume.first_name,
-            last_name=resume.last_name,
-            age=resume.age,
-            date_created=resume.date_created,
-            author_id=resume.author.id,
-            positions=positions,
-            hiring_cities=hiring_cities,
-            hobbies=hobbies,
-        )
 
-        self._session.add(db_resume)
+    def _read(self, query: Select) -> Iterator[tuple]:
+        """
+        Runs a column-only select through Core: rows are plain tuples
+        and the session doesn't track anything.
+        """
         self._session.flush()
-        resume.id = str(db_resume.id)
+        return self._session.connection().execute(query)
 
-    def _get_or_create_cities(self, cities: list[e.City]) -> list[City]:
-        query = select(City).where(or_(*[
-            and_(
-                City.name == city.name,
-                City.country == city.country
+    def _stream_resumes(self, query: Select, batch_size: int) -> Iterator[e.Resume]:
+        """
+        Server-side cursor; collections are selectin-loaded per batch,
+        since joined eager loading of collections can't be used with yield_per.
+        """
+        query = (
+            query
+            .options(
+                joinedload(Resume.author),
+                selectinload(Resume.positions),
+                selectinload(Resume.hiring_cities),
+                selectinload(Resume.hobbies),
             )
-            for city in cities
-        ]))
-        db_cities = self._session.execute(query).scalars().all()
-        db_cities_map = {
-            f'{city.country}_{city.name}': city
-            for city in db_cities
-        }
+            .execution_options(yield_per=batch_size)
+        )
+        for db_resume in self._session.execute(query).scalars():
+            yield self._resume_model_to_entity(db_resume)
 
-        return [
-            db_cities_map.get(
-                f'{city.country}_{city.name}',
-                City(name=city.name, country=city.country)
+    def _get_or_create_city_ids(
+        self,
+        cities: list[e.City],
+    ) -> dict[tuple[str, str], int]:
+        keys = list(dict.fromkeys((city.country, city.name) for city in cities))
+        city_ids = self.CITY_IDS.get_many(self._session, keys)
+
+        missing = [key for key in keys if key not in city_ids]
+        for chunk in chunked(missing, self.BULK_CHUNK_SIZE):
+            inserted = (
+                pg_insert(City)
+                .values([
+                    {'country': country, 'name': name}
+                    for country, name in chunk
+                ])
+                .on_conflict_do_nothing(index_elements=['name', 'country'])
+                .returning(City.country, City.name, City.id)
             )
-            for city in cities
-        ]
+            existing = (
+                select(City.country, City.name, City.id)
+                .where(tuple_(City.country, City.name).in_(chunk))
+            )
+            resolved = {
+                (country, name): id_
+                for country, name, id_ in self._upsert(inserted, existing, len(chunk))
+            }
+            city_ids.update(resolved)
+            self.CITY_IDS.put_many(self._session, resolved)
 
-    def _get_or_create_hobbies(self, hobbies: list[e.Hobby]) -> list[Hobby]:
-        query = select(Hobby).where(or_(*[
-            Hobby.name == hobby.name for hobby in hobbies
-        ]))
-        db_hobbies = self._session.execute(query).scalars().all()
-        db_hobbies_map = {hobby.name: hobby for hobby in db_hobbies}
-        return [
-            db_hobbies_map.get(hobby.name, Hobby(name=hobby.name))
-            for hobby in hobbies
-        ]
+        return city_ids
+
+    def _get_or_create_hobby_ids(self, hobbies: list[e.Hobby]) -> dict[str, int]:
+        names = list(dict.fromkeys(hobby.name for hobby in hobbies))
+        hobby_ids = self.HOBBY_IDS.get_many(self._session, names)
+
+        missing = [name for name in names if name not in hobby_ids]
+        for chunk in chunked(missing, self.BULK_CHUNK_SIZE):
+            inserted = (
+                pg_insert(Hobby)
+                .values([{'name': name} for name in chunk])
+                .on_conflict_do_nothing(index_elements=['name'])
+                .returning(Hobby.name, Hobby.id)
+            )
+            existing = select(Hobby.name, Hobby.id).where(Hobby.name.in_(chunk))
+            resolved = dict(self._upsert(inserted, existing, len(chunk)))
+            hobby_ids.update(resolved)
+            self.HOBBY_IDS.put_many(self._session, resolved)
+
+        return hobby_ids
+
+    def _get_or_create_organization_ids(self, organizations: list[str]) -> dict[str, int]:
+        names = list(dict.fromkeys(organizations))
+        organization_ids = self.ORGANIZATION_IDS.get_many(self._session, names)
+
+        missing = [name for name in names if name not in organization_ids]
+        for chunk in chunked(missing, self.BULK_CHUNK_SIZE):
+            inserted = (
+                pg_insert(Organization)
+                .values([{'name': name} for name in chunk])
+                .on_conflict_do_nothing(index_elements=['name'])
+                .returning(Organization.name, Organization.id)
+            )
+            existing = (
+                select(Organization.name, Organization.id)
+                .where(Organization.name.in_(chunk))
+            )
+            resolved = dict(self._upsert(inserted, existing, len(chunk)))
+            organization_ids.update(resolved)
+            self.ORGANIZATION_IDS.put_many(self._session, resolved)
+
+        return organization_ids
+
+    def _upsert(self, inserted: Insert, existing: Select, expected: int) -> list[Row]:
+        """
+        Inserts the missing rows and reads the present ones in one statement.
+        """
+        inserted = inserted.cte('inserted')
+        rows = self._session.execute(union_all(select(inserted), existing)).all()
+        if len(rows) < expected:
+            # a concurrent writer committed a conflicting row after the
+            # statement snapshot was taken, only a new snapshot sees it
+            rows = self._session.execute(existing).all()
+        return rows
+
+    @staticmethod
+    def resumes_query(
+        author_id: str | None = None,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> Select:
+        query = select(Resume)
+        if author_id is not None:
+            query = query.where(Resume.author_id == int(author_id))
+        return SqlRepository._paginate(query, limit, after)
+
+    @staticmethod
+    def resume_documents_query(
+        author_id: str,
+        limit: int | None = None,
+        after: e.ResumeCursor | None = None,
+    ) -> Select:
+        query = (
+            select(ResumeDocument.document)
+            .where(ResumeDocument.author_id == int(author_id))
+        )
+        return SqlRepository._paginate(
+            query, limit, after, ResumeDocument.date_created, ResumeDocument.resume_id,
+        )
+
+    @staticmethod
+    def hobbies_by_city_documents_query(city: e.City) -> Select:
+        hobby = func.jsonb_array_elements_text(ResumeDocument.document['hobbies'])
+        return (
+            select(hobby.label('name'))
+            .where(ResumeDocument.document.contains({
+                'hiring_cities': [{'name': city.name, 'country': city.country}],
+            }))
+            .order_by('name')
+        )
+
+    @staticmethod
+    def hobbies_by_city_query(city: e.City) -> Select:
+        return (
+            select(Hobby.name)
+            .join(Hobby.resumes)
+            .join(Resume.hiring_cities)
+            .where(City.name == city.name)
+            .where(City.country == city.country)
+            .order_by(Hobby.name)
+        )
+
+    @staticmethod
+    def users_grouped_by_organization_query(organization: str | None = None) -> Select:
+        query = (
+            select(User.id, User.login, User.password, Organization.name)
+            .join_from(organization_members, Organization)
+            .join_from(organization_members, User)
+            .order_by(Organization.name, User.login)
+        )
+        if organization is not None:
+            query = query.where(Organization.name == organization)
+        return query
+
+    @staticmethod
+    def coworkers_query(user_id: str) -> Select:
+        """
+        The user's organizations by ix_organization_members_user_id_organization_id,
+        then their members by the primary key of organization_members.
+        """
+        own = organization_members.alias('own')
+        other = organization_members.alias('other')
+        return (
+            select(User.id, User.login, User.password)
+            .select_from(own)
+            .join(other, other.c.organization_id == own.c.organization_id)
+            .join(User, User.id == other.c.user_id)
+            .where(own.c.user_id == int(user_id))
+            .where(other.c.user_id != int(user_id))
+            .distinct()
+            .order_by(User.login)
+        )
+
+    @staticmethod
+    def overlapping_coworkers_query(user_id: str) -> Select:
+        """
+        The user's positions through the author and employee indexes, then for
+        each of them the overlapping positions at its organization by a GiST scan
+        of ix_positions_organization_id_period.
+        """
+        own, other = aliased(Position, name='own'), aliased(Position, name='other')
+        own_resume, other_resume = aliased(Resume, name='own_resume'), aliased(Resume)
+        return (
+            select(User.id, User.login, User.password)
+            .select_from(own)
+            .join(own_resume, own_resume.id == own.employee_id)
+            .join(other, and_(
+                other.organization_id == own.organization_id,
+                position_period(other).overlaps(position_period(own)),
+            ))
+            .join(other_resume, other_resume.id == other.employee_id)
+            .join(User, User.id == other_resume.author_id)
+            .where(own_resume.author_id == int(user_id))
+            .where(other_resume.author_id != int(user_id))
+            .distinct()
+            .order_by(User.login)
+        )
+
+    @staticmethod
+    def _json_children() -> tuple:
+        """
+        One JSON array per collection, each built by a subquery
+        correlated to the resume, so every resume is a single row.
+        """
+        hobbies = (
+            select(func.json_agg(aggregate_order_by(Hobby.name, Hobby.name), type_=JSON))
+            .join(resume_to_hobby, resume_to_hobby.c.hobby_id == Hobby.id)
+            .where(resume_to_hobby.c.resume_id == Resume.id)
+            .scalar_subquery()
+        )
+        hiring_cities = (
+            select(func.json_agg(
+                aggregate_order_by(
+                    SqlRepository._json_object(name=City.name, country=City.country),
+                    City.name,
+                ),
+                type_=JSON,
+            ))
+            .join(resume_to_city, resume_to_city.c.city_id == City.id)
+            .where(resume_to_city.c.resume_id == Resume.id)
+            .scalar_subquery()
+        )
+        positions = (
+            select(func.json_agg(
+                aggregate_order_by(
+                    SqlRepository._json_object(
+                        job_title=Position.job_title,
+                        organization=Position.organization,
+                        date_start=Position.date_start,
+                        date_end=Position.date_end,
+                    ),
+                    Position.date_start,
+                ),
+                type_=JSON,
+            ))
+            .where(Position.employee_id == Resume.id)
+            .scalar_subquery()
+        )
+        return hobbies, hiring_cities, positions
+
+    @staticmethod
+    def _json_object(**columns):
+        # keys are inlined: json_build_object takes "any" arguments,
+        # so server-side prepared statements can't infer bind types
+        return func.json_build_object(*(
+            argument
+            for key, column in columns.items()
+            for argument in (literal_column(f"'{key}'"), column)
+        ))
+
+    @staticmethod
+    def _paginate(
+        query: Select,
+        limit: int | None,
+        after: e.ResumeCursor | None,
+        date_created=Resume.date_created,
+        id_=Resume.id,
+    ) -> Select:
+        """
+        Keyset pagination over the (date_created, id) DESC order,
+        a row-value range predicate served by the composite indexes.
+        """
+        if after is not None:
+            query = query.where(
+                tuple_(date_created, id_)
+                < tuple_(after.date_created, int(after.id))
+            )
+        query = query.order_by(date_created.desc(), id_.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     @staticmethod
     def _user_model_to_entity(user: User) -> e.User:
@@ -217,3 +664,91 @@ class SqlRepository:
                 for hobby in resume.hobbies
             ],
         )
+
+    @staticmethod
+    def _resume_document_to_entity(document: dict) -> e.Resume:
+        author = document['author']
+        return SqlRepository._resume_tuple_to_entity(
+            document['id'],
+            document['first_name'],
+            document['last_name'],
+            document['age'],
+            datetime.fromisoformat(document['date_created']),
+            author['id'],
+            author['login'],
+            author['password'],
+            document['hobbies'],
+            document['hiring_cities'],
+            document['positions'],
+        )
+
+    @staticmethod
+    def _resume_row_to_entity(
+        resume: Resume,
+        author: User,
+        hobbies: list[str] | None,
+        hiring_cities: list[dict] | None,
+        positions: list[dict] | None,
+    ) -> e.Resume:
+        return SqlRepository._resume_tuple_to_entity(
+            resume.id,
+            resume.first_name,
+            resume.last_name,
+            resume.age,
+            resume.date_created,
+            author.id,
+            author.login,
+            author.password,
+            hobbies,
+            hiring_cities,
+            positions,
+        )
+
+    @staticmethod
+    def _resume_tuple_to_entity(
+        id_: int,
+        first_name: str,
+        last_name: str,
+        age: int,
+        date_created: datetime,
+        author_id: int,
+        login: str,
+        password: str,
+        hobbies: list[str] | None,
+        hiring_cities: list[dict] | None,
+        positions: list[dict] | None,
+    ) -> e.Resume:
+        return e.Resume(
+            id=str(id_),
+            age=age,
+            first_name=first_name,
+            last_name=last_name,
+            date_created=date_created,
+            author=e.User(id=str(author_id), login=login, password=password),
+            hiring_cities=[
+                e.City(name=city['name'], country=city['country'])
+                for city in hiring_cities or []
+            ],
+            positions=[
+                e.Position(
+                    job_title=position['job_title'],
+                    organization=position['organization'],
+                    date_start=date.fromisoformat(position['date_start']),
+                    date_end=(
+                        date.fromisoformat(position['date_end'])
+                        if position['date_end'] is not None else None
+                    ),
+                )
+                for position in positions or []
+            ],
+            hobbies=[e.Hobby(name=name) for name in hobbies or []],
+        )
+
+
+event.listen(City.__table__, 'after_drop', lambda *_, **__: SqlRepository.CITY_IDS.clear())
+event.listen(Hobby.__table__, 'after_drop', lambda *_, **__: SqlRepository.HOBBY_IDS.clear())
+event.listen(
+    Organization.__table__,
+    'after_drop',
+    lambda *_, **__: SqlRepository.ORGANIZATION_IDS.clear(),
+)
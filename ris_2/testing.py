@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from datetime import date
+from io import TextIOWrapper, StringIO
+
+from neomodel import db, remove_all_labels, clear_neo4j_database
+from pymongo import MongoClient
+
+from ris_2 import entities as e
+from ris_2.settings import MONGODB_URI, NEO4J_URI
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.doc import MongoRepository
+from ris_2.repositories.graph import Neo4jRepository
+from ris_2.repositories.graph.schema import install_indexes
+from ris_2.repositories.memory import MemoryRepository
+from ris_2.repositories.cache import CachingRepository
+from ris_2.repositories.sql.core import Base, engine, session_factory
+
+
+def make_resume(author: e.User, city: str, hobby: str) -> e.Resume:
+    return e.Resume(
+        age=22,
+        first_name='Oleh',
+        last_name='Kyba',
+        author=author,
+        hiring_cities=[e.City(name=city, country='Ukraine')],
+        hobbies=[e.Hobby(name=hobby)],
+        positions=[
+            e.Position(
+                job_title='Middle Python Developer',
+                organization='EVO',
+                date_start=date(2022, 5, 18),
+            ),
+        ],
+    )
+
+
+@contextmanager
+def mongo_repository(embed_author: bool = False) -> MongoRepository:
+    client = MongoClient(MONGODB_URI)
+    db = client.db
+    users_collection = db.users
+    resumes_collection = db.resumes
+    repo = MongoRepository(users_collection, resumes_collection, embed_author=embed_author)
+    repo.ensure_indexes()
+
+    try:
+        yield repo
+    finally:
+        client.drop_database(db)
+
+
+@contextmanager
+def sql_repository(documents: bool = False) -> SqlRepository:
+    conn = engine.connect()
+    Base.metadata.create_all(conn)
+    with session_factory(future=True) as session:
+        try:
+            yield SqlRepository(session, documents=documents)
+        except:
+            session.rollback()
+        else:
+            session.commit()
+
+    Base.metadata.drop_all(conn)
+    conn.close()
+
+
+@contextmanager
+def neo4j_repository() -> Neo4jRepository:
+    db.set_connection(NEO4J_URI)
+    stdout = TextIOWrapper(StringIO())
+    install_indexes(stdout)
+    try:
+        yield Neo4jRepository()
+    finally:
+        clear_neo4j_database(db)
+        remove_all_labels(stdout)
+
+
+@contextmanager
+def memory_repository() -> MemoryRepository:
+    yield MemoryRepository()
+
+
+@contextmanager
+def cached_repository() -> CachingRepository:
+    with memory_repository() as repo:
+        yield CachingRepository(repo)
@@ -1,72 +1,124 @@
-from io import TextIOWrapper, StringIO
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 
 import pytest
-from pymongo import MongoClient
-from neomodel import db, install_all_labels, remove_all_labels, clear_neo4j_database
+import pytest_asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from sqlalchemy.orm import Session
 
+from ris_2.generator import DatasetConfig, load_dataset
 from ris_2.settings import MONGODB_URI, NEO4J_URI
-from ris_2.repositories.abc import Repository
-from ris_2.repositories.sql import SqlRepository
-from ris_2.repositories.doc import MongoRepository
-from ris_2.repositories.graph import Neo4jRepository
+from ris_2.repositories.abc import Repository, AsyncRepository
+from ris_2.repositories.sql import SqlRepository, AsyncSqlRepository
+from ris_2.repositories.doc import AsyncMongoRepository
+from ris_2.repositories.graph import AsyncNeo4jRepository
 from ris_2.repositories.sql.core import Base, engine, session_factory
+from ris_2.repositories.sql.async_core import async_engine, async_session_factory
+from ris_2.testing import (
+    cached_repository,
+    memory_repository,
+    mongo_repository,
+    neo4j_repository,
+    sql_repository,
+)
 
 
-@contextmanager
-def mongo_repository() -> MongoRepository:
-    client = MongoClient(MONGODB_URI)
+@pytest.fixture
+def dataset_config() -> DatasetConfig | None:
+    """
+    The dataset loaded into session, modules needing data override it.
+    """
+    return None
+
+
+@pytest.fixture
+def session(dataset_config: DatasetConfig | None) -> Session:
+    Base.metadata.create_all(engine)
+    with session_factory(future=True) as session:
+        if dataset_config is not None:
+            load_dataset(SqlRepository(session), dataset_config)
+        yield session
+        session.rollback()
+
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(params=[
+    'postgres', 'postgres_documents', 'mongodb', 'mongodb_embedded', 'neo4j', 'memory', 'cached',
+])
+def repository(request: pytest.FixtureRequest) -> Repository:
+    match request.param:
+        case 'mongodb':
+            with mongo_repository() as repo:
+                yield repo
+        case 'mongodb_embedded':
+            with mongo_repository(embed_author=True) as repo:
+                yield repo
+        case 'neo4j':
+            with neo4j_repository() as repo:
+                yield repo
+        case 'memory':
+            with memory_repository() as repo:
+                yield repo
+        case 'cached':
+            with cached_repository() as repo:
+                yield repo
+        case 'postgres_documents':
+            with sql_repository(documents=True) as repo:
+                yield repo
+        case _:
+            with sql_repository() as repo:
+                yield repo
+
+
+@asynccontextmanager
+async def async_mongo_repository() -> AsyncMongoRepository:
+    client = AsyncIOMotorClient(MONGODB_URI)
     db = client.db
     users_collection = db.users
     resumes_collection = db.resumes
-    repo = MongoRepository(users_collection, resumes_collection)
+
+    repo = AsyncMongoRepository(users_collection, resumes_collection)
+    await repo.ensure_indexes()
 
     try:
         yield repo
     finally:
-        resumes_collection.drop()
-        users_collection.drop()
-
-
-@contextmanager
-def sql_repository() -> SqlRepository:
-    conn = engine.connect()
-    Base.metadata.create_all(conn)
-    with session_factory(future=True) as session:
-        try:
-            yield SqlRepository(session)
-        except:
-            session.rollback()
-        else:
-            session.commit()
+        await client.drop_database(db)
+        client.close()
 
-    Base.metadata.drop_all(conn)
-    conn.close()
 
+@asynccontextmanager
+async def async_sql_repository() -> AsyncSqlRepository:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
-@contextmanager
-def neo4j_repository() -> Neo4jRepository:
-    db.set_connection(NEO4J_URI)
-    stdout = TextIOWrapper(StringIO())
-    install_all_labels(stdout)
     try:
-        yield Neo4jRepository()
+        yield AsyncSqlRepository(async_session_factory)
     finally:
-        clear_neo4j_database(db)
-        remove_all_labels(stdout)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await async_engine.dispose()
 
 
-@pytest.fixture(params=['postgres', 'mongodb', 'neo4j'])
-def repository(request: pytest.FixtureRequest) -> Repository:
+@asynccontextmanager
+async def async_neo4j_repository() -> AsyncNeo4jRepository:
+    with neo4j_repository():
+        repo = AsyncNeo4jRepository(NEO4J_URI)
+        try:
+            yield repo
+        finally:
+            repo.close()
+
+
+@pytest_asyncio.fixture(params=['postgres', 'mongodb', 'neo4j'])
+async def async_repository(request: pytest.FixtureRequest) -> AsyncRepository:
     match request.param:
         case 'mongodb':
-            with mongo_repository() as repo:
+            async with async_mongo_repository() as repo:
                 yield repo
         case 'neo4j':
-            with neo4j_repository() as repo:
+            async with async_neo4j_repository() as repo:
                 yield repo
         case _:
-            with sql_repository() as repo:
+            async with async_sql_repository() as repo:
                 yield repo
-
-
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from ris_2 import entities as e
+from ris_2.repositories.abc import AsyncRepository
+from ris_2.testing import make_resume
+
+
+@pytest.fixture
+def users() -> list[e.User]:
+    return [
+        e.User(login='o.kyba@ukma.edu.ua', password='very_secret'),
+        e.User(login='i.kurilko@smartweb.com.ua', password='very_secret'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_resume(
+    async_repository: AsyncRepository,
+    users: list[e.User],
+):
+    await async_repository.save_user(users[0])
+    resume = make_resume(users[0], 'Kyiv', 'sport')
+    await async_repository.save_resume(resume)
+
+    assert await async_repository.fetch_resume(resume.id) == resume
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads(
+    async_repository: AsyncRepository,
+    users: list[e.User],
+):
+    await async_repository.save_users(users)
+    resumes = [
+        make_resume(users[0], 'Kyiv', 'sport'),
+        make_resume(users[1], 'Lviv', 'reading'),
+    ]
+    await async_repository.save_resumes(resumes)
+
+    by_author, hobbies, cities, grouped = await asyncio.gather(
+        async_repository.fetch_resumes_by_author(users[1].id),
+        async_repository.fetch_all_hobbies(),
+        async_repository.fetch_all_cities(),
+        async_repository.fetch_users_grouped_by_organization(),
+    )
+
+    assert by_author == [resumes[1]]
+    assert hobbies == [e.Hobby(name='reading'), e.Hobby(name='sport')]
+    assert cities == [
+        e.City(name='Kyiv', country='Ukraine'),
+        e.City(name='Lviv', country='Ukraine'),
+    ]
+    assert grouped == {'EVO': [users[1], users[0]]}
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from ris_2.benchmark import compare, main
+
+
+def row(method: str, p95_ms: float) -> dict:
+    return {
+        'backend': 'postgres',
+        'size': 1000,
+        'method': method,
+        'p95_ms': p95_ms,
+    }
+
+
+def test_compare_reports_p95_regressions():
+    old = [row('fetch_resume', 1.0), row('fetch_all_cities', 2.0)]
+    new = [row('fetch_resume', 1.05), row('fetch_all_cities', 3.0)]
+
+    regressions = compare(old, new, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert 'fetch_all_cities' in regressions[0]
+
+
+def loading_row(loading: str, p95_ms: float) -> dict:
+    return {
+        'loading': loading,
+        'method': 'fetch_resume',
+        'children': 20,
+        'p95_ms': p95_ms,
+    }
+
+
+def test_compare_loading_results():
+    old = [loading_row('joined', 1.0), loading_row('json', 1.0)]
+    new = [loading_row('joined', 2.0), loading_row('json', 1.0)]
+
+    regressions = compare(old, new, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('joined fetch_resume 20')
+    with pytest.raises(ValueError):
+        compare([row('fetch_resume', 1.0)], new, threshold=0.1)
+
+
+def test_compare_rejects_files_without_results(tmp_path):
+    output = tmp_path / 'loading.json'
+    output.write_text(json.dumps([loading_row('joined', 1.0)]))
+
+    with pytest.raises(SystemExit):
+        main(['compare', str(output), str(output)])
+
+
+def test_run_memory_backend(tmp_path):
+    output = tmp_path / 'benchmark.json'
+
+    exit_code = main([
+        'run',
+        '--backends', 'memory',
+        '--sizes', '50',
+        '--calls', '5',
+        '--warmup', '1',
+        '--output', str(output),
+    ])
+
+    assert exit_code == 0
+    assert main(['compare', str(output), str(output)]) == 0
@@ -0,0 +1,124 @@
+import pytest
+
+from ris_2 import entities as e
+from ris_2.repositories.cache import CachingRepository
+from ris_2.repositories.memory import MemoryRepository
+from ris_2.testing import make_resume
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cached_repository(clock: FakeClock) -> CachingRepository:
+    return CachingRepository(MemoryRepository(), max_size=2, ttl=10, clock=clock)
+
+
+@pytest.fixture
+def user(cached_repository: CachingRepository) -> e.User:
+    user = e.User(login='o.kyba@ukma.edu.ua', password='very_secret')
+    cached_repository.save_user(user)
+    return user
+
+
+def test_hits_and_misses(cached_repository: CachingRepository, user: e.User):
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+
+    assert cached_repository.fetch_all_cities() == [e.City('Kyiv', 'Ukraine')]
+    assert cached_repository.fetch_all_cities() == [e.City('Kyiv', 'Ukraine')]
+
+    stats = cached_repository.stats
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_ttl_expiration(
+    cached_repository: CachingRepository,
+    clock: FakeClock,
+    user: e.User,
+):
+    cached_repository.fetch_all_hobbies()
+    clock.now = 11
+    cached_repository.fetch_all_hobbies()
+
+    stats = cached_repository.stats
+    assert (stats.misses, stats.expirations) == (2, 1)
+
+
+def test_lru_eviction(cached_repository: CachingRepository, user: e.User):
+    cached_repository.fetch_all_hobbies()
+    cached_repository.fetch_all_cities()
+    cached_repository.fetch_all_hobbies()
+    cached_repository.fetch_users_grouped_by_organization()
+    cached_repository.fetch_all_hobbies()
+
+    stats = cached_repository.stats
+    assert (stats.hits, stats.evictions) == (2, 1)
+
+
+def test_save_resume_invalidates_affected_keys(
+    cached_repository: CachingRepository,
+    user: e.User,
+):
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+    cached_repository.fetch_all_hobbies()
+    cached_repository.fetch_resumes_by_author(user.id)
+
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'reading'))
+
+    assert cached_repository.fetch_all_hobbies() == [
+        e.Hobby('reading'),
+        e.Hobby('sport'),
+    ]
+    assert len(cached_repository.fetch_resumes_by_author(user.id)) == 2
+    assert cached_repository.stats.hits == 0
+
+
+def test_save_resume_keeps_listings_it_does_not_change(
+    cached_repository: CachingRepository,
+    user: e.User,
+):
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+    cached_repository.fetch_all_cities()
+
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'reading'))
+
+    assert cached_repository.fetch_all_cities() == [e.City('Kyiv', 'Ukraine')]
+    assert cached_repository.stats.hits == 1
+
+
+def test_save_resume_invalidates_hobbies_by_city(
+    cached_repository: CachingRepository,
+    user: e.User,
+):
+    kyiv = e.City('Kyiv', 'Ukraine')
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+    cached_repository.fetch_hobbies_by_city(kyiv)
+
+    # a known hobby still changes the listing of backends returning a row per resume
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+    cached_repository.fetch_hobbies_by_city(kyiv)
+
+    assert cached_repository.stats.hits == 0
+
+
+def test_save_user_keeps_users_grouped_by_organization(
+    cached_repository: CachingRepository,
+    user: e.User,
+):
+    cached_repository.save_resume(make_resume(user, 'Kyiv', 'sport'))
+    grouped = cached_repository.fetch_users_grouped_by_organization()
+
+    cached_repository.save_user(e.User(login='i.kurilko@smartweb.com.ua', password='secret'))
+
+    assert cached_repository.fetch_users_grouped_by_organization() == grouped
+    assert cached_repository.stats.hits == 1
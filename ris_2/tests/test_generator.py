@@ -0,0 +1,37 @@
+from collections import Counter
+
+from ris_2.generator import DatasetConfig, DatasetGenerator, load_dataset
+from ris_2.repositories.memory import MemoryRepository
+
+
+CONFIG = DatasetConfig(users=50, resumes_per_user=3, seed=42)
+
+
+def test_generator_is_deterministic():
+    assert list(DatasetGenerator(CONFIG)) == list(DatasetGenerator(CONFIG))
+
+
+def test_generator_is_addressable_by_user_index():
+    generator = DatasetGenerator(CONFIG)
+
+    assert generator.user_with_resumes(7) == list(generator)[7]
+
+
+def test_city_popularity_is_skewed():
+    counts = Counter(
+        city.name
+        for _, resumes in DatasetGenerator(CONFIG)
+        for resume in resumes
+        for city in resume.hiring_cities
+    )
+
+    assert counts.most_common(1)[0][0] == 'City 0'
+
+
+def test_load_dataset():
+    repository = MemoryRepository()
+    load_dataset(repository, CONFIG, batch_size=7)
+
+    resumes = list(repository.iter_resumes())
+    assert len(resumes) == CONFIG.users * CONFIG.resumes_per_user
+    assert all(resume.author.id is not None for resume in resumes)
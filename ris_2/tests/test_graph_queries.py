@@ -0,0 +1,170 @@
+import pytest
+from neomodel import db
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, DatasetGenerator, load_dataset
+from ris_2.repositories.graph import queries
+from ris_2.repositories.graph.migrations import migrate_organizations
+from ris_2.repositories.graph.models import User
+from ris_2.repositories.graph.profiling import (
+    PlanningCost,
+    ServerTimings,
+    planning_cost,
+    profiled_operators,
+    server_timings,
+)
+from ris_2.testing import neo4j_repository
+
+
+def test_resumes_page_variants_are_precomputed():
+    assert len(queries.RESUMES_PAGE) == 8
+    for (_, with_after, with_limit), query in queries.RESUMES_PAGE.items():
+        assert ('$after' in query) == with_after
+        assert ('$limit' in query) == with_limit
+
+
+def test_hobbies_by_city_is_parameterized():
+    with neo4j_repository() as repository:
+        city = e.City("Kam'yanets", 'Ukraine')
+        assert repository.fetch_hobbies_by_city(city) == []
+
+
+def test_save_resumes_rejects_missing_author():
+    with neo4j_repository() as repository:
+        author = e.User(login='oleh', password='secret')
+        repository.save_user(author)
+        resumes = [
+            e.Resume(
+                age=22,
+                first_name='Oleh',
+                last_name='Kyba',
+                author=author,
+                hiring_cities=[],
+                hobbies=[],
+                positions=[],
+            ),
+            e.Resume(
+                age=33,
+                first_name='Igor',
+                last_name='Kurilko',
+                author=e.User(login='igor', password='secret', id='missing'),
+                hiring_cities=[],
+                hobbies=[],
+                positions=[],
+            ),
+        ]
+
+        with pytest.raises(User.DoesNotExist):
+            repository.save_resumes(resumes)
+
+        assert [resume.id for resume in resumes] == [None, None]
+        assert repository.fetch_resumes(limit=10) == []
+
+
+def test_saves_join_the_callers_transaction():
+    with neo4j_repository() as repository:
+        user = e.User(login='oleh', password='secret')
+        with pytest.raises(RuntimeError, match='roll back'), db.transaction:
+            repository.save_user(user)
+            repository.save_resume(e.Resume(
+                age=22,
+                first_name='Oleh',
+                last_name='Kyba',
+                author=user,
+                hiring_cities=[],
+                hobbies=[],
+                positions=[],
+            ))
+            raise RuntimeError('roll back')
+
+        assert repository.fetch_resumes(limit=10) == []
+        assert User.nodes.get_or_none(login='oleh') is None
+
+
+def test_planning_cost():
+    assert ServerTimings(available_after_ms=2, consumed_after_ms=4).total_ms == 6
+    assert PlanningCost(ServerTimings(7, 1), ServerTimings(2, 4)).planning_ms == 5
+    # a cached run that happened to be slower is not negative planning
+    assert PlanningCost(ServerTimings(3, 1), ServerTimings(5, 1)).planning_ms == 0
+
+
+def test_server_timings():
+    with neo4j_repository() as repository:
+        load_dataset(repository, DatasetConfig(users=10, resumes_per_user=2))
+        city, *_ = repository.fetch_all_cities()
+        assert repository.fetch_hobbies_by_city(city)
+        params = {'name': city.name, 'country': city.country}
+        timings = server_timings(queries.HOBBIES_BY_CITY, params)
+        cost = planning_cost(queries.HOBBIES_BY_CITY, params, repeat=5)
+
+    # None when the server does not report them
+    assert isinstance(timings.available_after_ms, int)
+    assert isinstance(timings.consumed_after_ms, int)
+    assert cost.cached.available_after_ms <= cost.replanned.available_after_ms
+
+
+def test_migrate_organizations():
+    with neo4j_repository() as repository:
+        load_dataset(repository, DatasetConfig(users=10, resumes_per_user=2))
+        expected = repository.fetch_users_grouped_by_organization()
+        db.cypher_query('MATCH (organization: Organization) DETACH DELETE organization')
+
+        linked = migrate_organizations(batch_size=7)
+
+        assert linked == sum(
+            len(resume.positions) for resume in repository.iter_resumes()
+        )
+        assert migrate_organizations() == 0
+        assert repository.fetch_users_grouped_by_organization() == expected
+
+
+def assert_index_seek(query: str, params: dict, operator: str, index: str):
+    operators = profiled_operators(query, params)
+
+    assert any(index in details for details in operators.get(operator, [])), operators
+    assert 'NodeByLabelScan' not in operators
+    assert 'AllNodesScan' not in operators
+
+
+def test_hot_queries_use_index_seeks():
+    config = DatasetConfig(users=10, resumes_per_user=2)
+    with neo4j_repository() as repository:
+        load_dataset(repository, config)
+        resume, = repository.fetch_resumes(limit=1)
+        user, (new_resume, *_) = DatasetGenerator(config).user_with_resumes(config.users)
+        repository.save_user(user)
+
+        assert_index_seek(
+            queries.HOBBIES_BY_CITY,
+            {'name': 'Kyiv', 'country': 'Ukraine'},
+            'NodeIndexSeek',
+            ':City(name, country)',
+        )
+        assert_index_seek(
+            queries.RESUMES_PAGE[(queries.ALL_RESUMES_MATCH, True, True)],
+            {
+                'after': repository._cursor_to_params(e.ResumeCursor.from_resume(resume)),
+                'limit': 10,
+            },
+            'NodeIndexSeekByRange',
+            ':Resume(date_created)',
+        )
+        assert_index_seek(
+            queries.USERS_OF_ORGANIZATION,
+            {'organization': 'Organization 0'},
+            'NodeUniqueIndexSeek',
+            ':Organization(name)',
+        )
+        assert_index_seek(
+            queries.OVERLAPPING_COWORKERS,
+            {'user_id': resume.author.id},
+            'NodeUniqueIndexSeek',
+            ':User(uid)',
+        )
+        # MERGE of the hiring cities
+        assert_index_seek(
+            queries.CREATE_RESUMES,
+            {'resumes': [repository._resume_entity_to_params(new_resume)]},
+            'NodeIndexSeek',
+            ':City(name, country)',
+        )
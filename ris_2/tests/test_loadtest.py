@@ -0,0 +1,66 @@
+import pytest
+
+from ris_2.loadtest import BUCKETS_MS, Operation, parse_mix, report, run
+
+
+def test_parse_mix():
+    assert parse_mix('fetch_resume=90,save_resume=10') == {
+        'fetch_resume': 90,
+        'save_resume': 10,
+    }
+
+    with pytest.raises(ValueError):
+        parse_mix('drop_everything=1')
+
+
+@pytest.mark.parametrize('sharing', ['per-worker', 'shared'])
+def test_run_memory_backend(sharing: str):
+    mix = parse_mix('fetch_resume=80,fetch_hobbies_by_city=10,save_resume=10')
+
+    operations = run(
+        'memory',
+        workers=2,
+        pool='thread',
+        sharing=sharing,
+        mix=mix,
+        duration=1,
+        users=20,
+        seed=0,
+    )
+    result = report(operations, duration=1)
+
+    assert set(result['methods']) <= set(mix)
+    assert len(result['timeline']) == 1
+    for method in result['methods'].values():
+        assert len(method['histogram']) == len(BUCKETS_MS) + 1
+        assert sum(method['histogram']) == method['calls']
+
+
+def test_timeline_histograms_show_tail_latency_over_time():
+    operations = [
+        Operation(started_at=0.5, method='fetch_resume', latency_ms=1.5, wait_ms=0),
+        Operation(started_at=1.2, method='fetch_resume', latency_ms=1.5, wait_ms=0),
+        Operation(started_at=1.7, method='fetch_resume', latency_ms=300, wait_ms=0),
+    ]
+
+    first, second = report(operations, duration=2)['timeline']
+
+    fast, slow = BUCKETS_MS.index(2), BUCKETS_MS.index(500)
+    assert first['histogram'][fast] == 1
+    assert sum(first['histogram']) == 1
+    assert (second['histogram'][fast], second['histogram'][slow]) == (1, 1)
+    assert sum(second['histogram']) == 2
+
+
+def test_memory_backend_rejects_processes():
+    with pytest.raises(ValueError):
+        run(
+            'memory',
+            workers=2,
+            pool='process',
+            sharing='per-worker',
+            mix=parse_mix('fetch_resume=1'),
+            duration=1,
+            users=20,
+            seed=0,
+        )
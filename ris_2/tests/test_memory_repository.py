@@ -0,0 +1,24 @@
+from datetime import date, timedelta
+from random import Random
+
+from ris_2.repositories.memory import MemoryRepository
+
+
+def test_overlapping_users_match_pairwise_comparison():
+    rng = Random(0)
+
+    def period() -> tuple[date, date]:
+        start = date(2000, 1, 1) + timedelta(days=rng.randrange(5000))
+        if rng.random() < 0.2:
+            return start, date.max
+        return start, start + timedelta(days=rng.randrange(1000))
+
+    for _ in range(200):
+        periods = sorted((*period(), f'user {rng.randrange(30)}') for _ in range(50))
+        own = [period() for _ in range(rng.randrange(1, 4))]
+
+        assert MemoryRepository._overlapping_users(periods, own) == {
+            user_id
+            for start, end, user_id in periods
+            if any(start <= own_end and own_start <= end for own_start, own_end in own)
+        }
@@ -0,0 +1,49 @@
+import pytest
+from pymongo import MongoClient
+from pymongo.database import Database
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, load_dataset
+from ris_2.repositories.doc import MongoRepository
+from ris_2.settings import MONGODB_URI
+
+
+@pytest.fixture
+def database() -> Database:
+    client = MongoClient(MONGODB_URI)
+    db = client.db
+    try:
+        yield db
+    finally:
+        client.drop_database(db)
+        client.close()
+
+
+def test_update_user_updates_snapshots(database: Database):
+    repository = MongoRepository(database.users, database.resumes, embed_author=True)
+    load_dataset(repository, DatasetConfig(users=2, resumes_per_user=3))
+    resume, *_ = repository.fetch_resumes(limit=1)
+    author = e.User(login='renamed', password='changed', id=resume.author.id)
+
+    repository.update_user(author)
+
+    resumes = repository.fetch_resumes_by_author(author.id)
+    assert len(resumes) == 3
+    assert [resume.author for resume in resumes] == [author] * 3
+    assert repository.check_author_snapshots() == 0
+
+
+def test_check_author_snapshots_repairs_stale_copies(database: Database):
+    load_dataset(
+        MongoRepository(database.users, database.resumes),
+        DatasetConfig(users=3, resumes_per_user=2),
+    )
+    repository = MongoRepository(database.users, database.resumes, embed_author=True)
+
+    assert repository.check_author_snapshots() == 6
+    assert repository.check_author_snapshots(repair=True, batch_size=2) == 6
+    assert repository.check_author_snapshots() == 0
+    assert (
+        repository.fetch_resumes(limit=10)
+        == MongoRepository(database.users, database.resumes).fetch_resumes(limit=10)
+    )
@@ -0,0 +1,128 @@
+from datetime import date
+
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.database import Database
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, load_dataset
+from ris_2.repositories.doc import MongoRepository
+from ris_2.repositories.doc.indexes import used_indexes
+from ris_2.repositories.doc.pipelines import (
+    coworkers_pipeline,
+    overlapping_coworkers_pipeline,
+    resumes_with_author_pipeline,
+)
+from ris_2.settings import MONGODB_URI
+
+
+@pytest.fixture
+def database() -> Database:
+    client = MongoClient(MONGODB_URI)
+    db = client.db
+    MongoRepository(db.users, db.resumes).ensure_indexes()
+    try:
+        yield db
+    finally:
+        client.drop_database(db)
+        client.close()
+
+
+def test_ensure_indexes_is_idempotent(database: Database):
+    repository = MongoRepository(database.users, database.resumes)
+
+    assert repository.ensure_indexes() == repository.ensure_indexes()
+
+
+def test_fetch_resumes_by_author_uses_index(database: Database):
+    explain = database.command(
+        'aggregate',
+        database.resumes.name,
+        pipeline=resumes_with_author_pipeline(
+            {'author_id': ObjectId()},
+            MongoRepository.RESUMES_ORDER,
+            limit=10,
+        ),
+        explain=True,
+    )
+
+    assert 'author_id_date_created_id' in used_indexes(explain)
+
+
+def test_fetch_hobbies_by_city_uses_index(database: Database):
+    explain = (
+        database.city_hobbies
+        .find(MongoRepository._city_hobbies_filter(e.City(name='Kyiv', country='Ukraine')))
+        .sort('hobby')
+        .explain()
+    )
+
+    assert 'city_hobby' in used_indexes(explain)
+
+
+def test_rebuild_counters_matches_incremental_counts(database: Database):
+    repository = MongoRepository(database.users, database.resumes)
+    load_dataset(repository, DatasetConfig(users=20, resumes_per_user=3))
+
+    def counters() -> list[list[dict]]:
+        return [
+            list(database.hobbies.find({}, sort=[('_id', 1)])),
+            list(database.cities.find({}, sort=[('_id', 1)])),
+            list(database.city_hobbies.find(
+                {},
+                {'_id': 0},
+                sort=[('city_name', 1), ('city_country', 1), ('hobby', 1)],
+            )),
+        ]
+
+    incremental = counters()
+    repository.rebuild_counters()
+
+    assert counters() == incremental
+    assert 'city_hobby' in database.city_hobbies.index_information()
+
+
+def test_fetch_coworkers_uses_index(database: Database):
+    explain = database.command(
+        'aggregate',
+        database.organizations.name,
+        pipeline=coworkers_pipeline(ObjectId()),
+        explain=True,
+    )
+
+    assert 'members' in used_indexes(explain)
+
+
+def test_rebuild_organizations_matches_incremental_members(database: Database):
+    repository = MongoRepository(database.users, database.resumes)
+    load_dataset(repository, DatasetConfig(users=20, resumes_per_user=3))
+
+    def organizations() -> dict[str, list[ObjectId]]:
+        return {
+            doc['_id']: sorted(doc['members'])
+            for doc in database.organizations.find()
+        }
+
+    incremental = organizations()
+    repository.rebuild_organizations()
+
+    assert organizations() == incremental
+    assert 'members' in database.organizations.index_information()
+
+
+def test_fetch_overlapping_coworkers_uses_index(database: Database):
+    position = MongoRepository._position_entity_to_doc(e.Position(
+        job_title='Engineer',
+        organization='EVO',
+        date_start=date(2020, 5, 18),
+        date_end=date(2021, 5, 17),
+    ))
+    explain = database.command(
+        'aggregate',
+        database.resumes.name,
+        pipeline=overlapping_coworkers_pipeline(ObjectId(), [position]),
+        explain=True,
+    )
+
+    assert 'positions_organization_date_start' in used_indexes(explain)
@@ -187,6 +187,77 @@ def test_fetch_resumes_by_author(
     assert resumes == [resume_2, resume_1]
 
 
+def test_fetch_resumes_by_author_paginated(
+    repository: Repository,
+    user_1: e.User,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+):
+    first_page = repository.fetch_resumes_by_author(user_1.id, limit=1)
+    second_page = repository.fetch_resumes_by_author(
+        user_1.id,
+        limit=1,
+        after=e.ResumeCursor.from_resume(first_page[-1]),
+    )
+    last_page = repository.fetch_resumes_by_author(
+        user_1.id,
+        limit=1,
+        after=e.ResumeCursor.from_resume(second_page[-1]),
+    )
+
+    assert first_page == [resume_2]
+    assert second_page == [resume_1]
+    assert last_page == []
+
+
+def test_fetch_resumes(
+    repository: Repository,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+):
+    first_page = repository.fetch_resumes(limit=2)
+    second_page = repository.fetch_resumes(
+        limit=2,
+        after=e.ResumeCursor.from_resume(first_page[-1]),
+    )
+
+    resumes = first_page + second_page
+    assert len(first_page) == 2
+    assert sorted(resumes, key=lambda resume: resume.id) == sorted(
+        [resume_1, resume_2, resume_3],
+        key=lambda resume: resume.id,
+    )
+    assert resumes[-1] == resume_1
+
+
+def test_iter_resumes(
+    repository: Repository,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+):
+    resumes = list(repository.iter_resumes(batch_size=2))
+
+    assert sorted(resumes, key=lambda resume: resume.id) == sorted(
+        [resume_1, resume_2, resume_3],
+        key=lambda resume: resume.id,
+    )
+
+
+def test_iter_resumes_by_author(
+    repository: Repository,
+    user_1: e.User,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+):
+    resumes = repository.iter_resumes_by_author(user_1.id, batch_size=1)
+
+    assert list(resumes) == [resume_2, resume_1]
+
+
 def test_fetch_all_hobbies(
     repository: Repository,
     resume_1: e.Resume,
@@ -287,3 +358,109 @@ def test_fetch_resumes_grouped_by_organization(
         'Reface': [user_3],
         'Simporter': [user_1, user_3],
     }
+
+
+def test_fetch_users_of_organization(
+    repository: Repository,
+    user_1: e.User,
+    user_2: e.User,
+    user_3: e.User,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+    resume_4: e.Resume,
+):
+    assert repository.fetch_users_grouped_by_organization('EVO') == {
+        'EVO': [user_2, user_1],
+    }
+    assert repository.fetch_users_grouped_by_organization('Unknown') == {}
+
+
+def test_fetch_coworkers(
+    repository: Repository,
+    user_1: e.User,
+    user_2: e.User,
+    user_3: e.User,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+    resume_4: e.Resume,
+):
+    assert repository.fetch_coworkers(user_1.id) == [user_2, user_3]
+    assert repository.fetch_coworkers(user_2.id) == [user_1]
+    assert repository.fetch_coworkers(user_3.id) == [user_1]
+
+
+def test_fetch_overlapping_coworkers(
+    repository: Repository,
+    user_1: e.User,
+    user_2: e.User,
+    user_3: e.User,
+    resume_1: e.Resume,
+    resume_2: e.Resume,
+    resume_3: e.Resume,
+    resume_4: e.Resume,
+):
+    # both still work at EVO, user_3 left Simporter before user_1 joined
+    assert repository.fetch_coworkers(user_1.id, overlapping=True) == [user_2]
+    assert repository.fetch_coworkers(user_2.id, overlapping=True) == [user_1]
+    assert repository.fetch_coworkers(user_3.id, overlapping=True) == []
+
+
+def test_save_users(repository: Repository):
+    users = [
+        e.User(login='o.kyba@ukma.edu.ua', password='very_secret'),
+        e.User(login='i.kurilko@smartweb.com.ua', password='very_secret'),
+    ]
+    repository.save_users(users)
+
+    assert all(user.id is not None for user in users)
+    assert users[0].id != users[1].id
+
+
+def test_save_resumes(
+    repository: Repository,
+    user_1: e.User,
+    user_2: e.User,
+):
+    resumes = [
+        e.Resume(
+            age=22,
+            first_name='Oleh',
+            last_name='Kyba',
+            author=user_1,
+            hiring_cities=[
+                e.City(name='Kyiv', country='Ukraine'),
+                e.City(name='Lviv', country='Ukraine'),
+            ],
+            hobbies=[e.Hobby(name='reading'), e.Hobby(name='sport')],
+            positions=[
+                e.Position(
+                    job_title='Middle Python Developer',
+                    organization='EVO',
+                    date_start=date(2022, 5, 18),
+                ),
+            ],
+        ),
+        e.Resume(
+            age=33,
+            first_name='Igor',
+            last_name='Kurilko',
+            author=user_2,
+            hiring_cities=[e.City(name='Kyiv', country='Ukraine')],
+            hobbies=[e.Hobby(name='sport')],
+            positions=[],
+        ),
+    ]
+    repository.save_resumes(resumes)
+
+    assert [repository.fetch_resume(resume.id) for resume in resumes] == resumes
+    assert repository.fetch_resumes_by_author(user_2.id) == [resumes[1]]
+    assert repository.fetch_all_cities() == [
+        e.City(name='Kyiv', country='Ukraine'),
+        e.City(name='Lviv', country='Ukraine'),
+    ]
+    assert repository.fetch_all_hobbies() == [
+        e.Hobby(name='reading'),
+        e.Hobby(name='sport'),
+    ]
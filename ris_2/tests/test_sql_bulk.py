@@ -0,0 +1,75 @@
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig, DatasetGenerator
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.bulk import _copy_value, copy_resumes
+
+
+def content(resume: e.Resume) -> tuple:
+    return (
+        resume.author.login,
+        resume.first_name,
+        resume.last_name,
+        resume.age,
+        resume.date_created,
+        tuple(sorted((city.country, city.name) for city in resume.hiring_cities)),
+        tuple(sorted(hobby.name for hobby in resume.hobbies)),
+        tuple(resume.positions),
+    )
+
+
+def test_copy_value_escapes_text_format():
+    assert _copy_value(None) == '\\N'
+    assert _copy_value('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
+    assert _copy_value(date(2022, 1, 2)) == '2022-01-02'
+
+
+def test_copy_resumes(session: Session):
+    generator = DatasetGenerator(DatasetConfig(users=20, resumes_per_user=3))
+    resumes = [resume for _, user_resumes in generator for resume in user_resumes]
+
+    loaded = copy_resumes(
+        session.connection(),
+        iter(resumes),
+        batch_size=7,
+    )
+
+    assert loaded == len(resumes)
+    saved = SqlRepository(session).fetch_resumes(limit=len(resumes) + 1)
+    assert sorted(map(content, saved)) == sorted(map(content, resumes))
+
+
+def test_copy_resumes_reuses_existing_rows(session: Session):
+    repository = SqlRepository(session)
+    user = e.User(login='oleh\tkyba', password='back\\slash')
+    repository.save_user(user)
+    repository.save_resume(e.Resume(
+        first_name='Oleh',
+        last_name='Kyba',
+        age=21,
+        author=user,
+        hiring_cities=[e.City(name='Kyiv', country='Ukraine')],
+        hobbies=[e.Hobby(name='chess')],
+        positions=[],
+        date_created=datetime(2022, 1, 1),
+    ))
+
+    copy_resumes(session.connection(), [e.Resume(
+        first_name='Oleh',
+        last_name='Kyba\nJr',
+        age=22,
+        author=user,
+        hiring_cities=[e.City(name='Kyiv', country='Ukraine')],
+        hobbies=[e.Hobby(name='chess')],
+        positions=[],
+        date_created=datetime(2022, 1, 2),
+    )])
+
+    assert repository.fetch_all_cities() == [e.City(name='Kyiv', country='Ukraine')]
+    assert repository.fetch_all_hobbies() == [e.Hobby(name='chess')]
+    newest, _ = repository.fetch_resumes_by_author(user.id)
+    assert newest.last_name == 'Kyba\nJr'
+    assert newest.author == user
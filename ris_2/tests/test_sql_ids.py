@@ -0,0 +1,137 @@
+import pytest
+from sqlalchemy import create_engine, false, insert, select
+from sqlalchemy.orm import Session
+
+from ris_2 import entities as e
+from ris_2.benchmark import count_statements
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.core import engine, session_factory
+from ris_2.repositories.sql.ids import IdCache
+from ris_2.repositories.sql.models import Hobby
+
+
+def test_ids_are_published_on_commit():
+    cache = IdCache(maxsize=10)
+    session = Session(future=True)
+
+    with session.begin():
+        cache.put_many(session, {'chess': 1})
+        assert cache.get_many(session, ['chess']) == {'chess': 1}
+        assert cache.get_many(Session(future=True), ['chess']) == {}
+
+    assert cache.get_many(Session(future=True), ['chess']) == {'chess': 1}
+
+
+def test_ids_are_discarded_on_rollback():
+    cache = IdCache(maxsize=10)
+    session = Session(future=True)
+
+    session.begin()
+    cache.put_many(session, {'chess': 1})
+    session.rollback()
+
+    assert cache.get_many(session, ['chess']) == {}
+    assert len(cache) == 0
+
+
+def test_least_recently_used_ids_are_evicted():
+    cache = IdCache(maxsize=2)
+    session = Session(future=True)
+
+    with session.begin():
+        cache.put_many(session, {'chess': 1, 'yoga': 2})
+    cache.get_many(session, ['chess'])
+    with session.begin():
+        cache.put_many(session, {'golf': 3})
+
+    assert cache.get_many(session, ['chess', 'yoga', 'golf']) == {'chess': 1, 'golf': 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ids_resolved_in_rolled_back_savepoint_are_discarded():
+    cache = IdCache(maxsize=10)
+    session = Session(create_engine('sqlite://'), future=True)
+
+    with session.begin():
+        cache.put_many(session, {'chess': 1})
+        savepoint = session.begin_nested()
+        cache.put_many(session, {'yoga': 2})
+        savepoint.rollback()
+        assert cache.get_many(session, ['chess', 'yoga']) == {'chess': 1}
+
+    assert cache.get_many(Session(future=True), ['chess', 'yoga']) == {'chess': 1}
+
+
+def test_ids_resolved_in_released_savepoint_wait_for_outer_commit():
+    cache = IdCache(maxsize=10)
+    session = Session(create_engine('sqlite://'), future=True)
+
+    session.begin()
+    with session.begin_nested():
+        cache.put_many(session, {'chess': 1})
+    assert len(cache) == 0
+    session.rollback()
+
+    assert cache.get_many(session, ['chess']) == {}
+    assert len(cache) == 0
+
+
+def test_upsert_inserts_new_and_reads_existing_names(session: Session):
+    existing_id = session.execute(
+        insert(Hobby).values(name='chess').returning(Hobby.id)
+    ).scalar_one()
+    session.commit()
+    SqlRepository.HOBBY_IDS.clear()
+    repository = SqlRepository(session)
+
+    hobby_ids = {}
+    statements, _ = count_statements(lambda: hobby_ids.update(
+        repository._get_or_create_hobby_ids([e.Hobby(name='chess'), e.Hobby(name='yoga')])
+    ))
+
+    assert statements == 1
+    assert hobby_ids['chess'] == existing_id
+    assert session.get(Hobby, hobby_ids['yoga']).name == 'yoga'
+
+
+def test_upsert_rereads_rows_committed_concurrently(
+    session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    with engine.begin() as concurrent:
+        concurrent_id = concurrent.execute(
+            insert(Hobby).values(name='chess').returning(Hobby.id)
+        ).scalar_one()
+
+    execute = session.execute
+    statements = []
+
+    def execute_racing(statement, *args, **kwargs):
+        statements.append(statement)
+        if len(statements) == 1:
+            # what a racing upsert reads: its insert hit the concurrently
+            # committed row, which its snapshot was taken too early to see
+            return execute(select(Hobby.name, Hobby.id).where(false()))
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(session, 'execute', execute_racing)
+    hobby_ids = SqlRepository(session)._get_or_create_hobby_ids([e.Hobby(name='chess')])
+
+    assert len(statements) == 2
+    assert hobby_ids == {'chess': concurrent_id}
+
+
+def test_cached_ids_need_no_lookup_queries(session: Session):
+    repository = SqlRepository(session)
+    hobbies = [e.Hobby(name='chess'), e.Hobby(name='yoga')]
+    hobby_ids = repository._get_or_create_hobby_ids(hobbies)
+    session.commit()
+
+    with session_factory(future=True) as other:
+        warm = {}
+        statements, rows = count_statements(lambda: warm.update(
+            SqlRepository(other)._get_or_create_hobby_ids(hobbies)
+        ))
+
+    assert (statements, rows) == (0, 0)
+    assert warm == hobby_ids
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.indexes import (
+    ensure_indexes,
+    explain,
+    sequential_scans,
+    used_indexes,
+    verify_indexes,
+)
+
+
+@pytest.fixture
+def dataset_config() -> DatasetConfig:
+    return DatasetConfig(users=50, resumes_per_user=3)
+
+
+@pytest.fixture(autouse=True)
+def prefer_indexes(session: Session) -> None:
+    # the tables are tiny, make the planner show what it would do at scale
+    session.execute(text('SET LOCAL enable_seqscan = off'))
+
+
+def test_verify_and_ensure_indexes(session: Session):
+    connection = session.connection()
+    connection.execute(text('ALTER TABLE resume_to_city DROP CONSTRAINT resume_to_city_pkey'))
+    connection.execute(text('DROP INDEX ix_positions_employee_id'))
+
+    assert verify_indexes(connection) == [
+        'missing primary key on resume_to_city',
+        'missing index ix_positions_employee_id on positions',
+    ]
+    assert len(ensure_indexes(connection)) == 2
+    assert verify_indexes(connection) == []
+
+
+def test_fetch_resumes_by_author_uses_index(session: Session):
+    plan = explain(session.connection(), SqlRepository.resumes_query('1', limit=10))
+
+    assert 'ix_resumes_author_id_date_created_id' in used_indexes(plan)
+    assert sequential_scans(plan) == set()
+
+
+def test_fetch_hobbies_by_city_uses_indexes(session: Session):
+    plan = explain(
+        session.connection(),
+        SqlRepository.hobbies_by_city_query(e.City(name='City 0', country='Ukraine')),
+    )
+
+    assert {
+        'uc_name_country',
+        'ix_resume_to_city_city_id_resume_id',
+    } <= used_indexes(plan)
+    assert sequential_scans(plan) == set()
+
+
+def test_fetch_users_of_organization_uses_indexes(session: Session):
+    plan = explain(
+        session.connection(),
+        SqlRepository.users_grouped_by_organization_query('Organization 0'),
+    )
+
+    assert {
+        'organizations_name_key',
+        'organization_members_pkey',
+        'users_pkey',
+    } <= used_indexes(plan)
+    assert sequential_scans(plan) == set()
+
+
+def test_fetch_overlapping_coworkers_uses_gist_index(session: Session):
+    plan = explain(session.connection(), SqlRepository.overlapping_coworkers_query('1'))
+
+    assert 'ix_positions_organization_id_period' in used_indexes(plan)
+    assert sequential_scans(plan) == set()
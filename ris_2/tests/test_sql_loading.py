@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from ris_2.generator import DatasetConfig
+from ris_2.repositories.sql import SqlRepository
+
+
+@pytest.fixture
+def dataset_config() -> DatasetConfig:
+    return DatasetConfig(
+        users=3,
+        resumes_per_user=4,
+        max_cities_per_resume=6,
+        max_hobbies_per_resume=6,
+        max_positions_per_resume=6,
+    )
+
+
+@pytest.mark.parametrize('loading', ['selectin', 'json', 'core'])
+def test_loading_strategies_match_joined(session: Session, loading: str):
+    methods = list(SqlRepository.LOADING)
+    joined = SqlRepository(session, dict.fromkeys(methods, 'joined'))
+    other = SqlRepository(session, dict.fromkeys(methods, loading))
+    resumes = joined.fetch_resumes(limit=100)
+
+    assert other.fetch_resumes(limit=100) == resumes
+    for resume in resumes:
+        assert other.fetch_resume(resume.id) == resume
+        assert (
+            other.fetch_resumes_by_author(resume.author.id)
+            == joined.fetch_resumes_by_author(resume.author.id)
+        )
+
+
+def test_unknown_loading_strategy(session: Session):
+    repository = SqlRepository(session, {'fetch_resumes': 'lazy'})
+
+    with pytest.raises(ValueError):
+        repository.fetch_resumes(limit=10)
+
+
+def test_core_reads_are_not_tracked(session: Session):
+    repository = SqlRepository(session, dict.fromkeys(SqlRepository.LOADING, 'core'))
+    session.expunge_all()
+
+    repository.fetch_resumes(limit=100)
+    repository.fetch_all_hobbies()
+    repository.fetch_users_grouped_by_organization()
+
+    assert not session.identity_map
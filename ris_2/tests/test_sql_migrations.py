@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ris_2.generator import DatasetConfig
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.indexes import verify_indexes
+from ris_2.repositories.sql.migrations import migrate_organizations
+
+
+@pytest.fixture
+def dataset_config() -> DatasetConfig:
+    return DatasetConfig(users=20, resumes_per_user=3)
+
+
+def test_migrate_organizations(session: Session):
+    repository = SqlRepository(session)
+    grouped = repository.fetch_users_grouped_by_organization()
+    user_ids = [user.id for users in grouped.values() for user in users]
+    coworkers = {user_id: repository.fetch_coworkers(user_id) for user_id in user_ids}
+
+    connection = session.connection()
+    # the schema before organizations existed
+    connection.execute(text('ALTER TABLE positions DROP COLUMN organization_id'))
+    connection.execute(text('DROP TABLE organization_members'))
+    connection.execute(text('DELETE FROM organizations'))
+    connection.execute(text(
+        '''
+        CREATE TABLE organization_members (
+            organization varchar(120),
+            user_id integer REFERENCES users (id),
+            PRIMARY KEY (organization, user_id)
+        )
+        '''
+    ))
+
+    migrate_organizations(connection)
+
+    assert verify_indexes(connection) == []
+    assert repository.fetch_users_grouped_by_organization() == grouped
+    for user_id in user_ids:
+        assert repository.fetch_coworkers(user_id) == coworkers[user_id]
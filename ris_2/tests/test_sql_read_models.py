@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from ris_2 import entities as e
+from ris_2.generator import DatasetConfig
+from ris_2.repositories.sql import SqlRepository
+from ris_2.repositories.sql.read_models import (
+    rebuild_organization_members,
+    rebuild_resume_documents,
+)
+
+
+@pytest.fixture
+def dataset_config() -> DatasetConfig:
+    return DatasetConfig(users=20, resumes_per_user=3)
+
+
+def test_rebuild_organization_members(session: Session):
+    repository = SqlRepository(session)
+    expected = repository.fetch_users_grouped_by_organization()
+
+    rows = rebuild_organization_members(session.connection())
+
+    assert rows == sum(map(len, expected.values()))
+    assert repository.fetch_users_grouped_by_organization() == expected
+
+
+def test_fetch_users_of_organization(session: Session):
+    repository = SqlRepository(session)
+    grouped = repository.fetch_users_grouped_by_organization()
+    organization, users = next(iter(grouped.items()))
+
+    assert repository.fetch_users_grouped_by_organization(organization) == {
+        organization: users,
+    }
+
+
+def test_resume_documents_match_normalized_reads(session: Session):
+    repository = SqlRepository(session)
+    documents = SqlRepository(session, documents=True)
+    rebuild_resume_documents(session.connection())
+
+    for resume in repository.fetch_resumes(limit=100):
+        assert documents.fetch_resume(resume.id) == resume
+        assert (
+            documents.fetch_resumes_by_author(resume.author.id, limit=2)
+            == repository.fetch_resumes_by_author(resume.author.id, limit=2)
+        )
+        for city in resume.hiring_cities:
+            assert (
+                documents.fetch_hobbies_by_city(city)
+                == repository.fetch_hobbies_by_city(city)
+            )
+
+
+def test_rebuilt_documents_keep_microseconds(session: Session):
+    repository = SqlRepository(session)
+    author = e.User(login='o.kyba@ukma.edu.ua', password='hash')
+    repository.save_user(author)
+    resume = e.Resume(
+        first_name='Olena',
+        last_name='Kyba',
+        age=30,
+        author=author,
+        hiring_cities=[e.City(name='Kyiv', country='Ukraine')],
+        positions=[],
+        hobbies=[e.Hobby(name='Chess')],
+        # PostgreSQL drops the trailing zero when it formats this timestamp
+        date_created=datetime(2023, 1, 2, 3, 4, 5, 123450),
+    )
+    repository.save_resume(resume)
+
+    rebuild_resume_documents(session.connection())
+
+    assert SqlRepository(session, documents=True).fetch_resume(resume.id) == resume
+
+
+def test_written_documents_sort_like_rebuilt_ones(session: Session):
+    documents = SqlRepository(session, documents=True)
+    author = e.User(login='o.kyba@ukma.edu.ua', password='hash')
+    documents.save_user(author)
+    # code point order differs from the database collation for these
+    resume = e.Resume(
+        first_name='Olena',
+        last_name='Kyba',
+        age=30,
+        author=author,
+        hiring_cities=[
+            e.City(name='lviv', country='Ukraine'),
+            e.City(name='Kyiv', country='Ukraine'),
+            e.City(name='Ōsaka', country='Japan'),
+        ],
+        positions=[],
+        hobbies=[e.Hobby(name='yoga'), e.Hobby(name='Chess'), e.Hobby(name='Ćwiczenia')],
+    )
+    documents.save_resume(resume)
+    written = documents.fetch_resume(resume.id)
+
+    rebuild_resume_documents(session.connection())
+
+    assert written == SqlRepository(session).fetch_resume(resume.id)
+    assert documents.fetch_resume(resume.id) == written
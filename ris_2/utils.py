@@ -0,0 +1,10 @@
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk